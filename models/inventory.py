@@ -1,4 +1,7 @@
+from collections import defaultdict
 from datetime import datetime
+import numpy as np
+import pandas as pd
 
 class InventoryItem:
     """
@@ -165,55 +168,181 @@ class InventoryItem:
         return item
 
 
-def detect_price_changes(old_inventory, new_inventory, threshold_percentage=5):
+def _detect_significant_changes(old_prices, new_prices, threshold_percentage):
     """
-    Detect significant price changes between old and new inventory
+    Compute percentage changes and flag those over the threshold
     
     Args:
-        old_inventory (list): Old inventory data
+        old_prices (np.ndarray): Snapshot prices, 0 where the item is new
+        new_prices (np.ndarray): Current prices aligned with old_prices
+        threshold_percentage (float): Minimum percentage change to report
+    
+    Returns:
+        tuple: (mask of significant rows, percentage change per row)
+    """
+    # Items that are new or priced at 0 on either side never count as a change
+    comparable = (old_prices != 0) & (new_prices != 0)
+    percent_changes = np.zeros_like(new_prices)
+    np.divide(new_prices - old_prices, old_prices, out=percent_changes, where=comparable)
+    percent_changes *= 100
+    
+    mask = comparable & (np.abs(percent_changes) >= threshold_percentage)
+    return mask, percent_changes
+
+
+def detect_price_changes(previous_prices, new_inventory, threshold_percentage=5):
+    """
+    Detect significant price changes between a price snapshot and new inventory
+    
+    Args:
+        previous_prices (dict): Prices before the change, keyed by item code
         new_inventory (list): New inventory data
         threshold_percentage (float): Minimum percentage change to report
     
     Returns:
         list: Items with significant price changes
     """
+    # Align the snapshot with items that have an item code
+    items = [item for item in new_inventory if item.get("item_code", "")]
+    new_prices = np.fromiter(
+        (item.get("price", 0) or 0 for item in items), dtype=np.float64, count=len(items)
+    )
+    old_prices = np.fromiter(
+        (previous_prices.get(item["item_code"], 0) or 0 for item in items), dtype=np.float64, count=len(items)
+    )
+    
+    mask, percent_changes = _detect_significant_changes(old_prices, new_prices, threshold_percentage)
+    
+    # Materialize records only for the significant rows, largest absolute change first
+    significant = np.flatnonzero(mask)
+    significant = significant[np.argsort(-np.abs(percent_changes[significant]), kind="stable")]
+    
     changes = []
+    for i in significant.tolist():
+        item = items[i]
+        changes.append({
+            "item_code": item["item_code"],
+            "name": item.get("name", ""),
+            "old_price": float(old_prices[i]),
+            "new_price": float(new_prices[i]),
+            "percentage_change": float(percent_changes[i]),
+            "unit": item.get("unit", "")
+        })
     
-    # Create a dictionary of old inventory items by name for quick lookup
-    old_items = {item.get("name", ""): item for item in old_inventory}
+    return changes
+
+
+def index_recipe_ingredients(recipes):
+    """
+    Flatten recipe ingredients into one table indexed by ingredient name
     
-    # Check each item in the new inventory
-    for new_item in new_inventory:
-        name = new_item.get("name", "")
-        new_price = new_item.get("price", 0)
-        
-        # Skip if name is empty or price is 0
-        if not name or new_price == 0:
-            continue
-            
-        # Check if this item exists in the old inventory
-        if name in old_items:
-            old_item = old_items[name]
-            old_price = old_item.get("price", 0)
-            
-            # Skip if old price is 0
-            if old_price == 0:
-                continue
-                
-            # Calculate percentage change
-            percent_change = ((new_price - old_price) / old_price) * 100
-            
-            # Check if change is significant
-            if abs(percent_change) >= threshold_percentage:
-                changes.append({
-                    "name": name,
-                    "old_price": old_price,
-                    "new_price": new_price,
-                    "percent_change": percent_change,
-                    "unit": new_item.get("unit", "")
-                })
-    
-    # Sort by absolute percentage change
-    changes.sort(key=lambda x: abs(x["percent_change"]), reverse=True)
-    
-    return changes
\ No newline at end of file
+    Args:
+        recipes (list): Recipe data
+    
+    Returns:
+        tuple: (DataFrame with one row per recipe ingredient,
+                dict of lowercased ingredient name -> row positions,
+                array of recipe total costs aligned with the recipe list)
+    """
+    ing_df = pd.DataFrame(
+        [
+            (i, ingredient.get("name", ""), ingredient.get("name", "").lower(), ingredient.get("amount", 0))
+            for i, recipe in enumerate(recipes)
+            for ingredient in recipe.get("ingredients", [])
+        ],
+        columns=["recipe_idx", "ingredient", "name", "amount"]
+    )
+    # Coerce the amounts once into a float column; unparseable amounts count as 0
+    ing_df["amount"] = pd.to_numeric(ing_df["amount"], errors="coerce").fillna(0.0).astype(np.float64)
+    
+    rows_by_name = defaultdict(list)
+    for row, name in enumerate(ing_df["name"].tolist()):
+        rows_by_name[name].append(row)
+    
+    recipe_costs = pd.to_numeric(
+        pd.Series([recipe.get("total_cost", 0) for recipe in recipes], dtype=object), errors="coerce"
+    ).fillna(0.0).to_numpy(dtype=np.float64)
+    
+    return ing_df, dict(rows_by_name), recipe_costs
+
+
+def analyze_price_impact(recipes, price_changes, ingredient_table=None, display_limit=50):
+    """
+    Calculate the cost impact of price changes on the recipes using the changed items
+    
+    Args:
+        recipes (list): Recipe data
+        price_changes (list): Price changes from detect_price_changes
+        ingredient_table (tuple, optional): Result of index_recipe_ingredients for these recipes
+        display_limit (int): Number of largest impacts to return for display
+    
+    Returns:
+        tuple: (DataFrame of all affected recipes in recipe order, its display_limit rows
+                with the largest impacts, dict of displayed recipe name -> row position,
+                DataFrame of priced ingredient rows)
+    """
+    if ingredient_table is None:
+        ingredient_table = index_recipe_ingredients(recipes)
+    ing_df, rows_by_name, recipe_costs = ingredient_table
+    
+    # One row per changed item name; the largest change wins for duplicate names
+    pc_df = pd.DataFrame(price_changes)[["name", "old_price", "new_price", "percentage_change"]].copy()
+    pc_df["name"] = pc_df["name"].str.lower()
+    pc_df = pc_df.drop_duplicates("name")
+    
+    # Visit only the ingredient rows whose item changed price, in recipe order
+    rows = sorted(row for name in pc_df["name"].tolist() for row in rows_by_name.get(name, []))
+    if not rows:
+        # No recipe uses a changed item, so there is nothing to price
+        affected_recipes = pd.DataFrame(
+            columns=["recipe_idx", "name", "total_impact", "impact_percentage", "affected_count", "severity"]
+        )
+        return affected_recipes, affected_recipes, {}, ing_df.iloc[rows]
+    
+    # Price every affected ingredient in one column-wise pass
+    impact_rows = ing_df.iloc[rows].merge(pc_df, on="name")
+    impact_rows["impact"] = impact_rows["amount"] * (impact_rows["new_price"] - impact_rows["old_price"])
+    
+    # Reduce the impacts per recipe with bincount over the recipe positions
+    recipe_positions = impact_rows["recipe_idx"].to_numpy(dtype=np.intp)
+    total_impacts = np.bincount(recipe_positions, weights=impact_rows["impact"].to_numpy(dtype=np.float64), minlength=len(recipes))
+    affected_counts = np.bincount(recipe_positions, minlength=len(recipes))
+    affected_positions = np.flatnonzero(affected_counts)
+    
+    # Impact as a share of each recipe's cost, 0 for recipes without a cost
+    affected_totals = total_impacts[affected_positions]
+    affected_costs = recipe_costs[affected_positions]
+    impact_percentages = np.zeros_like(affected_totals)
+    np.divide(affected_totals, affected_costs, out=impact_percentages, where=affected_costs > 0)
+    impact_percentages *= 100
+    
+    # Grade every recipe's impact in one pass
+    severities = np.select(
+        [impact_percentages > 5, impact_percentages > 2], ["🔴 High", "🟡 Moderate"], default="🟢 Low"
+    )
+    
+    # Keep the affected recipes as columns rather than one dict per recipe
+    affected_recipes = pd.DataFrame({
+        "recipe_idx": affected_positions,
+        "name": [recipes[recipe_idx].get("name", "Unnamed Recipe") for recipe_idx in affected_positions.tolist()],
+        "total_impact": affected_totals,
+        "impact_percentage": impact_percentages,
+        "affected_count": affected_counts[affected_positions],
+        "severity": severities
+    })
+    
+    # Only the largest impacts are displayed, so partition them out instead of sorting everything
+    abs_percentages = np.abs(impact_percentages)
+    if len(abs_percentages) > display_limit:
+        top_positions = np.argpartition(-abs_percentages, display_limit)[:display_limit]
+    else:
+        top_positions = np.arange(len(abs_percentages))
+    top_positions = top_positions[np.argsort(-abs_percentages[top_positions], kind="stable")]
+    top_recipes = affected_recipes.iloc[top_positions]
+    
+    # Resolve a displayed recipe by name, keeping the first recipe for duplicate names
+    name_to_recipe = {}
+    for name, row in zip(top_recipes["name"].tolist(), top_positions.tolist()):
+        name_to_recipe.setdefault(name, row)
+    
+    return affected_recipes, top_recipes, name_to_recipe, impact_rows
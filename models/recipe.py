@@ -1,4 +1,5 @@
 from datetime import datetime
+import numpy as np
 
 class Recipe:
     """
@@ -100,13 +101,22 @@ class Recipe:
             yield_unit=self.yield_unit
         )
         
-        for ingredient in self.ingredients:
-            new_recipe.add_ingredient(
-                name=ingredient["name"],
-                amount=ingredient["amount"] * scale_factor,
-                unit=ingredient["unit"],
-                cost=ingredient["cost"] * scale_factor
-            )
+        # Scale every amount and cost with one broadcast multiply, then cost once
+        scaled = np.array(
+            [(ingredient["amount"], ingredient["cost"]) for ingredient in self.ingredients],
+            dtype=np.float64
+        ).reshape(-1, 2) * scale_factor
+        
+        new_recipe.ingredients = [
+            {
+                "name": ingredient["name"],
+                "amount": amount,
+                "unit": ingredient["unit"],
+                "cost": cost
+            }
+            for ingredient, (amount, cost) in zip(self.ingredients, scaled.tolist())
+        ]
+        new_recipe.calculate_cost()
             
         new_recipe.preparation_steps = self.preparation_steps.copy()
         
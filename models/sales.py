@@ -1,4 +1,5 @@
 from datetime import datetime
+import numpy as np
 
 class SalesRecord:
     """
@@ -84,11 +85,16 @@ def analyze_sales(sales_data, period_days=30):
         except:
             continue
     
-    # Calculate total metrics
-    total_revenue = sum(record.get("revenue", 0) for record in filtered_sales)
-    total_cost = sum(record.get("cost", 0) for record in filtered_sales)
-    total_profit = sum(record.get("profit", 0) for record in filtered_sales)
-    total_quantity = sum(record.get("quantity", 0) for record in filtered_sales)
+    # Calculate total metrics with a single reduction over a (n, 4) float array
+    totals = np.fromiter(
+        (
+            (record.get("revenue", 0), record.get("cost", 0), record.get("profit", 0), record.get("quantity", 0))
+            for record in filtered_sales
+        ),
+        dtype=np.dtype((np.float64, 4)),
+        count=len(filtered_sales)
+    )
+    total_revenue, total_cost, total_profit, total_quantity = np.add.reduce(totals, axis=0).tolist()
     
     # Calculate average profit margin
     avg_profit_margin = 0
@@ -141,6 +147,15 @@ def analyze_sales(sales_data, period_days=30):
         reverse=True
     )
     
+    # Top items per metric as records carrying all of the item's totals
+    top_items_by = {}
+    for metric in ("revenue", "quantity", "profit"):
+        ranked = sorted(item_sales.items(), key=lambda x: x[1][metric], reverse=True)[:10]
+        top_items_by[metric] = [
+            {"name": item, "revenue": data["revenue"], "quantity": data["quantity"], "profit": data["profit"]}
+            for item, data in ranked
+        ]
+    
     # Group sales by date
     daily_sales = {}
     for record in filtered_sales:
@@ -180,6 +195,9 @@ def analyze_sales(sales_data, period_days=30):
         "top_profit_items": top_profit_items[:10],  # Top 10
         "top_quantity_items": top_quantity_items[:10],  # Top 10
         "top_margin_items": top_margin_items[:10],  # Top 10
+        "top_items_by_revenue": top_items_by["revenue"],
+        "top_items_by_quantity": top_items_by["quantity"],
+        "top_items_by_profit": top_items_by["profit"],
         "daily_sales": sorted_daily_sales
     }
 
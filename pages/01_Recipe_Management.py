@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import os
+import numpy as np
 import json
+import copy
+import uuid
 from datetime import datetime
-from utils.data_processing import load_data, save_data, process_excel_upload, calculate_recipe_cost
+from utils.data_processing import load_data_cached, save_recipes_data, process_excel_upload, read_excel_cached, calculate_recipe_cost, calculate_recipe_costs, session_cached, session_data_key
 from models.recipe import Recipe
 
 # Set page configuration
@@ -15,40 +17,87 @@ st.set_page_config(
 
 # Initialize session state variables if they don't exist
 if 'recipes' not in st.session_state:
-    if os.path.exists('data/recipes.json'):
-        st.session_state.recipes = load_data('data/recipes.json')
-    else:
-        st.session_state.recipes = []
+    recipes_data = load_data_cached('data/recipes.json')
+    # Saved files wrap the list in a dict with a 'data' field
+    if isinstance(recipes_data, dict) and 'data' in recipes_data:
+        recipes_data = recipes_data['data']
+    st.session_state.recipes = recipes_data
 
 if 'inventory' not in st.session_state:
-    if os.path.exists('data/inventory.json'):
-        st.session_state.inventory = load_data('data/inventory.json')
-    else:
-        st.session_state.inventory = []
+    inventory_data = load_data_cached('data/inventory.json')
+    if isinstance(inventory_data, dict) and 'data' in inventory_data:
+        inventory_data = inventory_data['data']
+    st.session_state.inventory = inventory_data
 
-# Helper function to save recipes
+# Helper function to save recipes, leaving out "_" fields that older versions of this page stored on the records
 def save_recipes():
-    save_data(st.session_state.recipes, 'data/recipes.json')
+    recipes = [
+        {key: value for key, value in recipe.items() if not key.startswith("_")}
+        for recipe in st.session_state.recipes
+    ]
+    save_recipes_data(recipes)
+
+# Build an ingredient display table column-wise from the ingredient dicts
+def ingredient_table(ingredients):
+    ing_df = pd.DataFrame(ingredients, columns=["name", "amount", "unit", "cost"])
+    ing_df = ing_df.fillna({"name": "", "amount": 0, "unit": "", "cost": 0})
+    ing_df["cost"] = ing_df["cost"].astype(float).map("${:.2f}".format)
+    return ing_df.rename(columns={"name": "Name", "amount": "Amount", "unit": "Unit", "cost": "Cost"})
+
+# Lowercased inventory name -> first matching item
+def build_inventory_name_index():
+    index = {}
+    for item in st.session_state.inventory:
+        index.setdefault(item.get("name", "").lower(), item)
+    return index
+
+# Inventory name index, rebuilt only when the inventory changes
+def inventory_name_index():
+    return session_cached("inventory_name_index", build_inventory_name_index, session_data_key("inventory"))
+
+# Number of recipe cards rendered per page in the recipe list
+RECIPES_PER_PAGE = 20
+
+# Unit options for the Add Ingredient form, built once rather than per rerun
+INGREDIENT_UNITS = ("g", "kg", "ml", "L", "tbsp", "tsp", "cup", "oz", "lb", "pcs", "each", "slice", "whole")
+
+# Default recipe form state, built once at import
+RECIPE_FORM_DEFAULTS = {
+    "new_recipe_name": "",
+    "new_recipe_yield_amount": 1,
+    "new_recipe_yield_unit": "serving",
+    "new_recipe_ingredients": [],
+    "new_recipe_preparation_steps": []
+}
 
 # Helper function to clear recipe form
 def clear_recipe_form():
-    st.session_state.new_recipe_name = ""
-    st.session_state.new_recipe_yield_amount = 1
-    st.session_state.new_recipe_yield_unit = "serving"
-    st.session_state.new_recipe_ingredients = []
-    st.session_state.new_recipe_preparation_steps = []
+    for key, value in RECIPE_FORM_DEFAULTS.items():
+        # Shallow copy so each form gets fresh ingredient/step lists
+        st.session_state[key] = copy.copy(value)
 
 # Initialize recipe form state if needed
-if 'new_recipe_name' not in st.session_state:
-    st.session_state.new_recipe_name = ""
-if 'new_recipe_yield_amount' not in st.session_state:
-    st.session_state.new_recipe_yield_amount = 1
-if 'new_recipe_yield_unit' not in st.session_state:
-    st.session_state.new_recipe_yield_unit = "serving"
-if 'new_recipe_ingredients' not in st.session_state:
-    st.session_state.new_recipe_ingredients = []
-if 'new_recipe_preparation_steps' not in st.session_state:
-    st.session_state.new_recipe_preparation_steps = []
+for key, value in RECIPE_FORM_DEFAULTS.items():
+    if key not in st.session_state:
+        st.session_state[key] = copy.copy(value)
+
+# Recipe uids queued for deletion by the Delete buttons
+if 'pending_recipe_deletions' not in st.session_state:
+    st.session_state.pending_recipe_deletions = set()
+
+def queue_recipe_deletion(uid):
+    st.session_state.pending_recipe_deletions.add(uid)
+
+# Apply queued deletions with a single rebuild and save
+if st.session_state.pending_recipe_deletions:
+    pending = st.session_state.pending_recipe_deletions
+    st.session_state.recipes = [
+        recipe for recipe in st.session_state.recipes
+        if recipe.get("uid") not in pending
+    ]
+    st.session_state.pending_recipe_deletions = set()
+    save_recipes()
+    st.success("Recipe deleted!")
 
 # Page title
 st.title("📝 Recipe Management")
@@ -72,66 +121,77 @@ with tab1:
             ["Name (A-Z)", "Name (Z-A)", "Cost (Low to High)", "Cost (High to Low)"]
         )
     
-    # Apply filters and sorting
-    filtered_recipes = st.session_state.recipes.copy()
+    # Apply filters and sorting on arrays of recipe indices
+    recipes = st.session_state.recipes
+    names_lower = pd.Series([str(recipe.get("name", "")) for recipe in recipes], dtype=object).str.lower()
+    indices = np.arange(len(recipes))
     
     # Search filter
     if search_term:
-        filtered_recipes = [
-            recipe for recipe in filtered_recipes
-            if search_term.lower() in recipe.get("name", "").lower()
-        ]
+        mask = names_lower.str.contains(search_term.lower(), regex=False).to_numpy()
+        indices = np.flatnonzero(mask)
     
     # Sorting
-    if sort_by == "Name (A-Z)":
-        filtered_recipes.sort(key=lambda x: x.get("name", "").lower())
-    elif sort_by == "Name (Z-A)":
-        filtered_recipes.sort(key=lambda x: x.get("name", "").lower(), reverse=True)
-    elif sort_by == "Cost (Low to High)":
-        filtered_recipes.sort(key=lambda x: x.get("total_cost", 0))
-    elif sort_by == "Cost (High to Low)":
-        filtered_recipes.sort(key=lambda x: x.get("total_cost", 0), reverse=True)
+    if sort_by in ("Name (A-Z)", "Name (Z-A)"):
+        sort_keys = names_lower.to_numpy()[indices]
+    else:
+        sort_keys = np.fromiter(
+            (recipes[i].get("total_cost", 0) for i in indices),
+            dtype=np.float64,
+            count=len(indices)
+        )
+    order = np.argsort(sort_keys, kind="stable")
+    if sort_by in ("Name (Z-A)", "Cost (High to Low)"):
+        order = order[::-1]
+    
+    filtered_recipes = [recipes[i] for i in indices[order]]
     
-    # Display recipes
+    # Display recipes, one page of cards per rerun
     if filtered_recipes:
-        for i, recipe in enumerate(filtered_recipes):
+        num_pages = (len(filtered_recipes) - 1) // RECIPES_PER_PAGE + 1
+        page = 1
+        if num_pages > 1:
+            page = st.number_input("Page", min_value=1, max_value=num_pages, value=1, step=1)
+        
+        start = (page - 1) * RECIPES_PER_PAGE
+        page_recipes = filtered_recipes[start:start + RECIPES_PER_PAGE]
+        st.caption(f"Showing {start + 1}-{start + len(page_recipes)} of {len(filtered_recipes)} recipes")
+        
+        for recipe in page_recipes:
+            # Stable id for widget keys and deletion, persisted on the next save
+            uid = recipe.setdefault("uid", uuid.uuid4().hex)
+            
             with st.expander(f"{recipe.get('name', 'Unnamed Recipe')} - ${recipe.get('total_cost', 0):.2f}"):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
-                    st.markdown(f"**Yield:** {recipe.get('yield_amount', 1)} {recipe.get('yield_unit', 'serving')}")
-                    st.markdown(f"**Cost per {recipe.get('yield_unit', 'serving')}:** ${recipe.get('cost_per_unit', 0):.2f}")
+                    # One markdown element per card summary instead of one per line
+                    recipe_yield_unit = recipe.get('yield_unit', 'serving')
+                    st.markdown(
+                        f"**Yield:** {recipe.get('yield_amount', 1)} {recipe_yield_unit}  \n"
+                        f"**Cost per {recipe_yield_unit}:** ${recipe.get('cost_per_unit', 0):.2f}  \n"
+                        f"**Ingredients:** {len(recipe.get('ingredients', []))}"
+                    )
                     
                     st.subheader("Ingredients")
-                    ingredient_data = []
+                    ingredient_df = ingredient_table(recipe.get("ingredients", []))
                     
-                    for ingredient in recipe.get("ingredients", []):
-                        ingredient_data.append({
-                            "Name": ingredient.get("name", ""),
-                            "Amount": ingredient.get("amount", 0),
-                            "Unit": ingredient.get("unit", ""),
-                            "Cost": f"${ingredient.get('cost', 0):.2f}"
-                        })
-                    
-                    if ingredient_data:
-                        st.table(pd.DataFrame(ingredient_data))
+                    if not ingredient_df.empty:
+                        st.table(ingredient_df)
                     else:
                         st.info("No ingredients specified.")
                     
                     st.subheader("Preparation Steps")
-                    for j, step in enumerate(recipe.get("preparation_steps", [])):
-                        st.markdown(f"{j+1}. {step}")
+                    preparation_steps = recipe.get("preparation_steps", [])
                     
-                    if not recipe.get("preparation_steps", []):
+                    if preparation_steps:
+                        st.markdown("\n".join(f"{j+1}. {step}" for j, step in enumerate(preparation_steps)))
+                    else:
                         st.info("No preparation steps specified.")
                 
                 with col2:
                     # Actions
-                    if st.button("Delete Recipe", key=f"delete_{i}"):
-                        st.session_state.recipes.remove(recipe)
-                        save_recipes()
-                        st.success("Recipe deleted!")
-                        st.rerun()
+                    st.button("Delete Recipe", key=f"delete_{uid}", on_click=queue_recipe_deletion, args=(uid,))
                     
                     # Scale recipe
                     # Convert yield to float to ensure consistent types
@@ -140,10 +200,10 @@ with tab1:
                         "Scale recipe to yield:",
                         min_value=1.0,
                         value=current_yield,
-                        key=f"scale_{i}"
+                        key=f"scale_{uid}"
                     )
                     
-                    if st.button("Scale Recipe", key=f"scale_btn_{i}"):
+                    if st.button("Scale Recipe", key=f"scale_btn_{uid}"):
                         # Create Recipe object
                         recipe_obj = Recipe.from_dict(recipe)
                         
@@ -155,17 +215,10 @@ with tab1:
                         st.markdown(f"**New Yield:** {scaled_recipe.yield_amount} {scaled_recipe.yield_unit}")
                         st.markdown(f"**New Cost:** ${scaled_recipe.total_cost:.2f}")
                         
-                        ingredient_data = []
-                        for ingredient in scaled_recipe.ingredients:
-                            ingredient_data.append({
-                                "Name": ingredient.get("name", ""),
-                                "Amount": ingredient.get("amount", 0),
-                                "Unit": ingredient.get("unit", ""),
-                                "Cost": f"${ingredient.get('cost', 0):.2f}"
-                            })
+                        ingredient_df = ingredient_table(scaled_recipe.ingredients)
                         
-                        if ingredient_data:
-                            st.table(pd.DataFrame(ingredient_data))
+                        if not ingredient_df.empty:
+                            st.table(ingredient_df)
     else:
         st.info("No recipes found. Add some recipes to get started!")
 
@@ -212,22 +265,14 @@ with tab2:
             new_ingredient_amount = st.number_input("Amount", min_value=0.0, step=0.1, value=1.0)
         
         with col3:
-            new_ingredient_unit = st.selectbox(
-                "Unit",
-                ["g", "kg", "ml", "L", "tbsp", "tsp", "cup", "oz", "lb", "pcs", "each", "slice", "whole"]
-            )
+            new_ingredient_unit = st.selectbox("Unit", INGREDIENT_UNITS)
         
         # Try to find this ingredient in inventory for cost
         new_ingredient_cost = 0.0
-        matched_ingredient = None
-        
-        for item in st.session_state.inventory:
-            if item.get("name", "").lower() == new_ingredient_name.lower():
-                matched_ingredient = item
-                new_ingredient_cost = item.get("price", 0.0) * new_ingredient_amount
-                break
+        matched_ingredient = inventory_name_index().get(new_ingredient_name.lower())
         
         if matched_ingredient:
+            new_ingredient_cost = matched_ingredient.get("price", 0.0) * new_ingredient_amount
             st.success(f"Found {new_ingredient_name} in inventory at ${matched_ingredient.get('price', 0.0):.2f} per {matched_ingredient.get('unit', 'unit')}")
             st.info(f"Estimated cost: ${new_ingredient_cost:.2f}")
         
@@ -306,7 +351,7 @@ with tab3:
     if uploaded_file:
         # Preview file
         try:
-            df = pd.read_excel(uploaded_file)
+            df = read_excel_cached(uploaded_file.getvalue())
             st.write("File Preview:")
             st.dataframe(df.head())
             
@@ -342,7 +387,7 @@ with tab3:
             if st.button("Import Recipes"):
                 with st.spinner("Processing..."):
                     # Process the file
-                    result = process_excel_upload(uploaded_file, "recipe", column_mapping)
+                    result = process_excel_upload(uploaded_file, "recipe", column_mapping, df=df)
                     
                     if "error" in result:
                         st.error(f"Error processing file: {result['error']}")
@@ -358,14 +403,11 @@ with tab3:
                         else:
                             st.session_state.recipes = result["data"]
                         
-                        # Calculate recipe costs
-                        for i, recipe in enumerate(st.session_state.recipes):
-                            # Create a Recipe object
-                            recipe_obj = Recipe.from_dict(recipe)
-                            # Calculate costs
-                            recipe_obj.calculate_cost()
-                            # Replace recipe with updated version
-                            st.session_state.recipes[i] = recipe_obj.to_dict()
+                        # Calculate recipe costs for all recipes in one pass
+                        total_costs, costs_per_unit = calculate_recipe_costs(st.session_state.recipes)
+                        for recipe, total_cost, cost_per_unit in zip(st.session_state.recipes, total_costs.tolist(), costs_per_unit.tolist()):
+                            recipe["total_cost"] = total_cost
+                            recipe["cost_per_unit"] = cost_per_unit
                         
                         # Save recipes
                         save_recipes()
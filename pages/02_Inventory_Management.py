@@ -4,9 +4,11 @@ import numpy as np
 import os
 import json
 import io
+import copy
 from datetime import datetime
-from utils.data_processing import process_excel_upload, generate_column_mapping_ui, load_data, save_data
-from models.inventory import detect_price_changes, InventoryItem
+from collections import defaultdict
+from utils.data_processing import process_excel_upload, read_excel_cached, generate_column_mapping_ui, load_data, save_data, load_records, save_inventory_data, session_cached, session_data_key
+from models.inventory import detect_price_changes, index_recipe_ingredients, analyze_price_impact, InventoryItem
 
 # Set page configuration
 st.set_page_config(
@@ -17,10 +19,10 @@ st.set_page_config(
 
 # Initialize session state variables if they don't exist
 if 'inventory' not in st.session_state:
-    if os.path.exists('data/inventory.json'):
-        st.session_state.inventory = load_data('data/inventory.json')
-    else:
-        st.session_state.inventory = []
+    st.session_state.inventory = load_records('data/inventory.json', 'data/inventory.parquet')
+
+if 'inventory_version' not in st.session_state:
+    st.session_state.inventory_version = 0
 
 if 'column_mappings' not in st.session_state:
     if os.path.exists('data/column_mappings.json'):
@@ -28,8 +30,8 @@ if 'column_mappings' not in st.session_state:
     else:
         st.session_state.column_mappings = {}
 
-if 'previous_inventory' not in st.session_state:
-    st.session_state.previous_inventory = []
+if 'previous_prices' not in st.session_state:
+    st.session_state.previous_prices = {}
 
 if 'edit_inventory_index' not in st.session_state:
     st.session_state.edit_inventory_index = -1
@@ -37,12 +39,151 @@ if 'edit_inventory_index' not in st.session_state:
 if 'new_inventory_item' not in st.session_state:
     st.session_state.new_inventory_item = InventoryItem().to_dict()
 
+# Number of affected recipes listed in the price impact analysis
+IMPACT_DISPLAY_LIMIT = 50
+
+# Number of affected ingredients listed in a recipe's impact details
+IMPACT_DETAIL_LIMIT = 10
+
+# Recommendation shown for each recipe impact severity level
+IMPACT_RECOMMENDATIONS = {
+    "🔴 High": (st.warning, """
+    The price changes have a significant impact on this recipe's cost.
+    Consider the following actions:
+    - Adjust menu prices to maintain profit margins
+    - Look for alternative suppliers for the affected ingredients
+    - Consider reformulating the recipe to use less expensive ingredients
+    """),
+    "🟡 Moderate": (st.info, """
+    The price changes have a moderate impact on this recipe's cost.
+    Consider monitoring these ingredients closely and look for alternatives
+    if prices continue to increase.
+    """),
+    "🟢 Low": (st.success, """
+    The price changes have a minimal impact on this recipe's cost.
+    No immediate action is required, but continue to monitor prices.
+    """)
+}
+
 # Create necessary directories if they don't exist
 os.makedirs('data', exist_ok=True)
 
 # Helper function to save inventory
 def save_inventory():
-    save_data(st.session_state.inventory, 'data/inventory.json')
+    # Every inventory mutation ends in a save, which also marks derived views stale
+    save_inventory_data(st.session_state.inventory)
+
+# Helper function to memoize a value derived from the inventory until the inventory changes
+def inventory_cached(name, build):
+    return session_cached(f'inventory:{name}', build, session_data_key('inventory'))
+
+# Helper function to build the inventory as a typed DataFrame
+def build_inventory_df():
+    inventory_df = pd.DataFrame(st.session_state.inventory)
+    for col in ['item_code', 'name', 'category', 'unit', 'supplier', 'updated_at']:
+        if col not in inventory_df.columns:
+            inventory_df[col] = ""
+    for col in ['price', 'stock_level']:
+        if col not in inventory_df.columns:
+            inventory_df[col] = 0.0
+        inventory_df[col] = pd.to_numeric(inventory_df[col], errors='coerce').fillna(0.0)
+    inventory_df['item_code'] = inventory_df['item_code'].fillna("").astype(str)
+    inventory_df['name'] = inventory_df['name'].fillna("").astype(str)
+    inventory_df['category'] = inventory_df['category'].fillna("Uncategorized")
+    # Parse timestamps once with the ISO8601 fast path instead of on every render
+    inventory_df['updated_at'] = pd.to_datetime(inventory_df['updated_at'], format='ISO8601', errors='coerce', utc=True)
+    return inventory_df
+
+# Helper function to get the cached inventory DataFrame
+def get_inventory_df():
+    return inventory_cached('inventory_df', build_inventory_df)
+
+# Helper function to get the sorted unique values of an inventory field
+def get_unique_values(field, default=''):
+    return inventory_cached(
+        f"unique_{field}_{default}",
+        lambda: sorted(set(item.get(field, default) for item in st.session_state.inventory))
+    )
+
+# Helper function to map lowercased ingredient names to recipe names
+def build_ingredient_recipe_index():
+    index = defaultdict(list)
+    for recipe in st.session_state.recipes:
+        recipe_name = recipe.get('name', 'Unnamed Recipe')
+        for ingredient_name in {ingredient.get('name', '').lower() for ingredient in recipe.get('ingredients', [])}:
+            index[ingredient_name].append(recipe_name)
+    return dict(index)
+
+# Helper function to get the ingredient to recipes index, rebuilt when the recipes change
+def get_ingredient_recipe_index():
+    return session_cached('ingredient_recipe_index', build_ingredient_recipe_index, session_data_key('recipes'))
+
+# Helper function to get the flattened recipe ingredient table, rebuilt when the recipes change
+def get_recipe_ingredient_table():
+    return session_cached(
+        'recipe_ingredient_table',
+        lambda: index_recipe_ingredients(st.session_state.recipes),
+        session_data_key('recipes')
+    )
+
+# Helper function to memoize the price impact analysis until its inputs change
+def price_impact_cached(build):
+    return session_cached(
+        'price_impact',
+        build,
+        session_data_key('inventory', 'recipes') + (id(st.session_state.previous_prices),)
+    )
+
+# Helper function to render the detailed impact of the selected recipe, rerun on its own as a fragment
+@st.fragment
+def show_price_impact_details(affected_recipes, top_recipes, name_to_recipe, impact_rows):
+    # The breakdown is only built once the user asks for it
+    if st.toggle("Show detailed impact", key="show_impact_details"):
+        selected_recipe = st.selectbox(
+            "View detailed impact for:",
+            top_recipes['name'].tolist()
+        )
+        
+        # Find the selected recipe's row
+        selected_position = name_to_recipe.get(selected_recipe)
+        
+        if selected_position is not None:
+            selected_data = affected_recipes.iloc[selected_position]
+            
+            st.write(f"### Impact Details for {selected_recipe}")
+            
+            # Show impact metrics
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Cost Impact", f"${selected_data['total_impact']:.2f}")
+            with col2:
+                st.metric("Percentage Impact", f"{selected_data['impact_percentage']:+.1f}%")
+            
+            # Show the largest affected ingredients, sliced from the priced ingredient rows
+            selected_rows = impact_rows[impact_rows['recipe_idx'] == selected_data['recipe_idx']]
+            top_rows = selected_rows.loc[selected_rows['impact'].abs().nlargest(IMPACT_DETAIL_LIMIT).index]
+            ing_impact_df = pd.DataFrame({
+                'Ingredient': top_rows['ingredient'].to_numpy(),
+                'Cost Impact': top_rows['impact'].to_numpy(),
+                'Price Change': top_rows['percentage_change'].to_numpy()
+            })
+            
+            st.dataframe(
+                ing_impact_df,
+                hide_index=True,
+                column_config={
+                    "Cost Impact": st.column_config.NumberColumn("Cost Impact", format="$%.2f"),
+                    "Price Change": st.column_config.NumberColumn("Price Change", format="%+.1f%%")
+                }
+            )
+            if len(selected_rows) > len(top_rows):
+                st.caption(f"+{len(selected_rows) - len(top_rows)} more affected ingredients")
+            
+            # Recommendations
+            st.subheader("Recommendations")
+            
+            show_recommendation, recommendation = IMPACT_RECOMMENDATIONS[selected_data['severity']]
+            show_recommendation(recommendation)
 
 # Helper function to save column mappings
 def save_column_mappings():
@@ -70,55 +211,34 @@ with tab1:
     with col2:
         category_filter = st.selectbox(
             "Filter by category",
-            ["All Categories"] + sorted(list(set(item.get('category', 'Uncategorized') for item in st.session_state.inventory)))
+            ["All Categories"] + get_unique_values('category', 'Uncategorized')
         )
     
-    # Apply filters
-    filtered_inventory = st.session_state.inventory
+    # Apply filters as boolean masks over the cached DataFrame
+    inventory_df = get_inventory_df()
+    mask = np.ones(len(inventory_df), dtype=bool)
     if search_term:
-        filtered_inventory = [
-            item for item in filtered_inventory 
-            if search_term.lower() in item.get('name', '').lower() or 
-               search_term.lower() in item.get('item_code', '').lower()
-        ]
+        mask &= (
+            inventory_df['name'].str.contains(search_term, case=False, regex=False) |
+            inventory_df['item_code'].str.contains(search_term, case=False, regex=False)
+        ).to_numpy()
     
     if category_filter != "All Categories":
-        filtered_inventory = [
-            item for item in filtered_inventory 
-            if item.get('category', 'Uncategorized') == category_filter
-        ]
+        mask &= (inventory_df['category'] == category_filter).to_numpy()
+    
+    filtered_df = inventory_df[mask]
     
     # Display inventory data
-    if not filtered_inventory:
+    if filtered_df.empty:
         st.info("No inventory items found. Add items or import inventory data.")
     else:
-        # Convert to DataFrame for display
-        inventory_df = pd.DataFrame(filtered_inventory)
-        
-        # Select columns to display - only use columns that exist in the DataFrame
+        # Select columns to display
         all_display_columns = ['item_code', 'name', 'category', 'price', 'unit', 'stock_level', 'supplier', 'updated_at']
-        available_columns = [col for col in all_display_columns if col in inventory_df.columns]
-        display_df = inventory_df[available_columns].copy()
-        
-        # Add missing columns with default values
-        for col in all_display_columns:
-            if col not in available_columns:
-                if col in ['price', 'stock_level']:
-                    display_df[col] = 0.0
-                else:
-                    display_df[col] = ""
-        
-        # Format columns safely - handle missing values
-        if 'price' in display_df.columns:
-            display_df['price'] = display_df['price'].apply(lambda x: f"${float(x):.2f}" if pd.notna(x) else "$0.00")
+        # Price stays numeric; the grid formats it so sorting remains numeric too
+        display_df = filtered_df[all_display_columns].copy()
         
-        if 'updated_at' in display_df.columns:
-            try:
-                display_df['updated_at'] = pd.to_datetime(display_df['updated_at'], errors='coerce').dt.strftime('%Y-%m-%d')
-                # Replace NaT values
-                display_df['updated_at'] = display_df['updated_at'].fillna("")
-            except:
-                display_df['updated_at'] = ""
+        # updated_at was parsed with errors='coerce', so unparseable values are already NaT
+        display_df['updated_at'] = display_df['updated_at'].dt.strftime('%Y-%m-%d').fillna("")
         
         # Create mapping from original column names to display names
         column_name_map = {
@@ -147,7 +267,7 @@ with tab1:
                 "Item Code": st.column_config.TextColumn("Item Code"),
                 "Name": st.column_config.TextColumn("Name"),
                 "Category": st.column_config.TextColumn("Category"),
-                "Price": st.column_config.TextColumn("Price"),
+                "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
                 "Unit": st.column_config.TextColumn("Unit"),
                 "Stock Level": st.column_config.NumberColumn("Stock Level", format="%.2f"),
                 "Supplier": st.column_config.TextColumn("Supplier"),
@@ -155,36 +275,35 @@ with tab1:
             }
         )
         
-        # Inventory summary metrics
+        # Inventory summary metrics, computed on the raw float64 arrays
         st.subheader("Inventory Summary")
+        prices = filtered_df['price'].to_numpy(dtype=np.float64, copy=False)
+        stock_levels = filtered_df['stock_level'].to_numpy(dtype=np.float64, copy=False)
+        low_stock_mask = stock_levels < 5
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Items", len(filtered_inventory))
+            st.metric("Total Items", len(filtered_df))
         
         with col2:
-            total_value = sum(item.get('price', 0) * item.get('stock_level', 0) for item in filtered_inventory)
+            total_value = float(np.dot(prices, stock_levels))
             st.metric("Total Value", f"${total_value:.2f}")
         
         with col3:
-            avg_price = sum(item.get('price', 0) for item in filtered_inventory) / len(filtered_inventory) if filtered_inventory else 0
+            avg_price = float(prices.mean())
             st.metric("Average Price", f"${avg_price:.2f}")
         
         with col4:
-            low_stock_count = sum(1 for item in filtered_inventory if item.get('stock_level', 0) < 5)
+            low_stock_count = int(np.count_nonzero(low_stock_mask))
             st.metric("Low Stock Items", low_stock_count)
         
         # Low stock items alert
         if low_stock_count > 0:
-            with st.expander("View Low Stock Items"):
-                low_stock_items = [item for item in filtered_inventory if item.get('stock_level', 0) < 5]
-                low_stock_df = pd.DataFrame([{
-                    'Item Code': item.get('item_code', ''),
-                    'Name': item.get('name', ''),
-                    'Current Stock': item.get('stock_level', 0),
-                    'Unit': item.get('unit', ''),
-                    'Supplier': item.get('supplier', '')
-                } for item in low_stock_items])
+            # A collapsed expander still runs its body, so the table sits behind a toggle
+            if st.toggle("View Low Stock Items", key="show_low_stock"):
+                low_stock_df = filtered_df.loc[low_stock_mask, ['item_code', 'name', 'stock_level', 'unit', 'supplier']]
+                low_stock_df.columns = ['Item Code', 'Name', 'Current Stock', 'Unit', 'Supplier']
                 
                 st.dataframe(low_stock_df, hide_index=True)
 
@@ -206,7 +325,7 @@ with tab2:
         )
         
         # Get unique categories from existing inventory
-        existing_categories = sorted(list(set(item.get('category', '') for item in st.session_state.inventory)))
+        existing_categories = get_unique_values('category')
         
         # Allow selecting existing category or entering new one
         category_input = st.selectbox(
@@ -254,7 +373,7 @@ with tab2:
         
         with supplier_stock_col1:
             # Get unique suppliers from existing inventory
-            existing_suppliers = sorted(list(set(item.get('supplier', '') for item in st.session_state.inventory)))
+            existing_suppliers = get_unique_values('supplier')
             
             supplier_select = st.selectbox(
                 "Supplier",
@@ -296,12 +415,19 @@ with tab2:
             # Price history if available
             price_history = old_item.get('price_history', [])
             if price_history:
-                hist_df = pd.DataFrame(price_history)
-                hist_df['date'] = pd.to_datetime(hist_df['date']).dt.strftime('%Y-%m-%d')
-                hist_df.columns = ['Price', 'Date']
-                hist_df['Price'] = hist_df['Price'].apply(lambda x: f"${x:.2f}")
+                # Build the two columns directly instead of framing the entry dicts
+                hist_df = pd.DataFrame({
+                    'Price': [entry.get('price', 0.0) for entry in price_history],
+                    'Date': pd.to_datetime(
+                        [entry.get('date', '') for entry in price_history], format='ISO8601', errors='coerce'
+                    ).strftime('%Y-%m-%d')
+                })
                 
-                st.dataframe(hist_df, hide_index=True)
+                st.dataframe(
+                    hist_df,
+                    hide_index=True,
+                    column_config={"Price": st.column_config.NumberColumn("Price", format="$%.2f")}
+                )
             else:
                 st.info("No price history available for this item.")
         
@@ -315,12 +441,7 @@ with tab2:
         
         # Find recipes using this ingredient
         if 'recipes' in st.session_state and item_name:
-            used_in = []
-            for recipe in st.session_state.recipes:
-                for ingredient in recipe.get('ingredients', []):
-                    if ingredient.get('name', '').lower() == item_name.lower():
-                        used_in.append(recipe.get('name', 'Unnamed Recipe'))
-                        break
+            used_in = get_ingredient_recipe_index().get(item_name.lower(), [])
             
             if used_in:
                 for recipe_name in used_in:
@@ -399,18 +520,27 @@ with tab2:
         st.info("No inventory items to edit.")
     else:
         # Create a list of items for selection
-        item_options = [f"{item.get('item_code', '')} - {item.get('name', '')}" for item in st.session_state.inventory]
+        item_options = inventory_cached(
+            'item_options',
+            lambda: [f"{item.get('item_code', '')} - {item.get('name', '')}" for item in st.session_state.inventory]
+        )
+        # Map each option to its inventory index, keeping the first item for duplicate labels
+        option_to_index = inventory_cached(
+            'option_to_index',
+            lambda: {option: i for i, option in reversed(list(enumerate(item_options)))}
+        )
         selected_item = st.selectbox("Select item to edit or delete", ["Select an item..."] + item_options)
         
         if selected_item != "Select an item...":
             # Get the index of the selected item
-            item_index = item_options.index(selected_item) - 1  # Adjust for "Select an item..." entry
+            item_index = option_to_index[selected_item]
             
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Edit Selected"):
                     st.session_state.edit_inventory_index = item_index
-                    st.session_state.new_inventory_item = st.session_state.inventory[item_index].copy()
+                    # Deep copy so price history edits don't alias the stored item
+                    st.session_state.new_inventory_item = copy.deepcopy(st.session_state.inventory[item_index])
                     st.rerun()
             
             with col2:
@@ -430,7 +560,7 @@ with tab3:
     
     if uploaded_file:
         # Preview the data
-        df = pd.read_excel(uploaded_file)
+        df = read_excel_cached(uploaded_file.getvalue())
         st.write("Preview of uploaded data:")
         st.dataframe(df.head())
         
@@ -460,118 +590,85 @@ with tab3:
                 
                 # Process the upload
                 with st.spinner("Processing data..."):
-                    # Store previous inventory for price change detection
-                    st.session_state.previous_inventory = st.session_state.inventory.copy()
+                    # Snapshot current prices by item code for price change detection
+                    st.session_state.previous_prices = {
+                        item.get('item_code', ''): item.get('price', 0.0)
+                        for item in st.session_state.inventory
+                    }
                     
                     # Process the upload
-                    result = process_excel_upload(uploaded_file, 'inventory', mapping)
+                    result = process_excel_upload(uploaded_file, 'inventory', mapping, df=df)
                     
                     if result['status'] == 'success':
                         # Get the processed data
                         new_items = result['data']
                         
-                        # Handle based on import option
-                        if import_option == "Add new items only":
-                            # Only add items with item codes that don't exist yet
-                            existing_codes = [item.get('item_code', '') for item in st.session_state.inventory]
-                            items_to_add = [item for item in new_items if item.get('item_code', '') not in existing_codes]
-                            
-                            st.session_state.inventory.extend(items_to_add)
-                            st.success(f"Added {len(items_to_add)} new items to inventory.")
-                            
-                        elif import_option == "Update existing items only":
-                            # Only update existing items
-                            existing_codes = [item.get('item_code', '') for item in st.session_state.inventory]
-                            updated_count = 0
-                            
-                            for new_item in new_items:
-                                item_code = new_item.get('item_code', '')
-                                if item_code in existing_codes:
-                                    # Find the item index
-                                    item_index = next((i for i, item in enumerate(st.session_state.inventory) 
-                                                    if item.get('item_code', '') == item_code), -1)
-                                    
-                                    if item_index >= 0:
-                                        # Get the old item for price history
-                                        old_item = st.session_state.inventory[item_index]
-                                        old_price = old_item.get('price', 0.0)
-                                        new_price = new_item.get('price', 0.0)
-                                        
-                                        # Update price history if price changed
-                                        if old_price != new_price:
-                                            if 'price_history' not in new_item:
-                                                new_item['price_history'] = old_item.get('price_history', [])
-                                            
-                                            new_item['price_history'].append({
-                                                "price": old_price,
-                                                "date": datetime.now().isoformat()
-                                            })
-                                        else:
-                                            # Keep existing price history
-                                            new_item['price_history'] = old_item.get('price_history', [])
-                                        
-                                        # Keep created_at from original item
-                                        new_item['created_at'] = old_item.get('created_at', datetime.now().isoformat())
-                                        
-                                        # Update the item
-                                        st.session_state.inventory[item_index] = new_item
-                                        updated_count += 1
-                            
-                            st.success(f"Updated {updated_count} existing items.")
-                            
-                        else:  # "Add new and update existing"
-                            # Update existing items and add new ones
-                            existing_codes = [item.get('item_code', '') for item in st.session_state.inventory]
-                            updated_count = 0
-                            added_count = 0
+                        # The import option decides which side of the match is applied
+                        add_new = import_option != "Update existing items only"
+                        update_existing = import_option != "Add new items only"
+                        
+                        # Locate existing items through an item_code -> index dict
+                        code_to_index = {}
+                        for i, item in enumerate(st.session_state.inventory):
+                            code_to_index.setdefault(item.get('item_code', ''), i)
+                        updated_count = 0
+                        added_count = 0
+                        
+                        # One timestamp for the whole import batch
+                        now_iso = datetime.now().isoformat()
+                        
+                        for new_item in new_items:
+                            item_code = new_item.get('item_code', '')
+                            item_index = code_to_index.get(item_code, -1)
                             
-                            for new_item in new_items:
-                                item_code = new_item.get('item_code', '')
+                            if item_index >= 0:
+                                if not update_existing:
+                                    continue
+                                
+                                # Update existing item, keeping the old one for price history
+                                old_item = st.session_state.inventory[item_index]
+                                old_price = old_item.get('price', 0.0)
+                                new_price = new_item.get('price', 0.0)
                                 
-                                if item_code in existing_codes:
-                                    # Update existing item
-                                    item_index = next((i for i, item in enumerate(st.session_state.inventory) 
-                                                    if item.get('item_code', '') == item_code), -1)
+                                # Update price history if price changed
+                                if old_price != new_price:
+                                    if 'price_history' not in new_item:
+                                        new_item['price_history'] = old_item.get('price_history', [])
                                     
-                                    if item_index >= 0:
-                                        # Get the old item for price history
-                                        old_item = st.session_state.inventory[item_index]
-                                        old_price = old_item.get('price', 0.0)
-                                        new_price = new_item.get('price', 0.0)
-                                        
-                                        # Update price history if price changed
-                                        if old_price != new_price:
-                                            if 'price_history' not in new_item:
-                                                new_item['price_history'] = old_item.get('price_history', [])
-                                            
-                                            new_item['price_history'].append({
-                                                "price": old_price,
-                                                "date": datetime.now().isoformat()
-                                            })
-                                        else:
-                                            # Keep existing price history
-                                            new_item['price_history'] = old_item.get('price_history', [])
-                                        
-                                        # Keep created_at from original item
-                                        new_item['created_at'] = old_item.get('created_at', datetime.now().isoformat())
-                                        
-                                        # Update the item
-                                        st.session_state.inventory[item_index] = new_item
-                                        updated_count += 1
+                                    new_item['price_history'].append({
+                                        "price": old_price,
+                                        "date": now_iso
+                                    })
                                 else:
-                                    # Add new item
-                                    new_item['price_history'] = []
-                                    new_item['created_at'] = datetime.now().isoformat()
-                                    st.session_state.inventory.append(new_item)
-                                    added_count += 1
-                            
+                                    # Keep existing price history
+                                    new_item['price_history'] = old_item.get('price_history', [])
+                                
+                                # Keep created_at from original item
+                                new_item['created_at'] = old_item.get('created_at', now_iso)
+                                
+                                # Update the item
+                                st.session_state.inventory[item_index] = new_item
+                                updated_count += 1
+                            elif add_new:
+                                # Add new item
+                                new_item['price_history'] = []
+                                new_item['created_at'] = now_iso
+                                code_to_index[item_code] = len(st.session_state.inventory)
+                                st.session_state.inventory.append(new_item)
+                                added_count += 1
+                        
+                        if import_option == "Add new items only":
+                            st.success(f"Added {added_count} new items to inventory.")
+                        elif import_option == "Update existing items only":
+                            st.success(f"Updated {updated_count} existing items.")
+                        else:
                             st.success(f"Added {added_count} new items and updated {updated_count} existing items.")
                         
                         # Save the updated inventory
                         save_inventory()
                         
                         # Redirect to price changes tab if there were updates
-                        if import_option != "Add new items only" and st.session_state.previous_inventory:
+                        if import_option != "Add new items only" and st.session_state.previous_prices:
                             st.rerun()
                     else:
                         st.error(f"Error processing data: {result['message']}")
@@ -601,12 +698,12 @@ with tab4:
     )
     
     if analysis_option == "Compare with previous import":
-        # Use the previous inventory stored during import
-        if not st.session_state.previous_inventory:
+        # Use the price snapshot stored during import
+        if not st.session_state.previous_prices:
             st.info("No previous import data available for comparison. Please import new inventory data first.")
         else:
             # Detect price changes
-            price_changes = detect_price_changes(st.session_state.previous_inventory, st.session_state.inventory)
+            price_changes = detect_price_changes(st.session_state.previous_prices, st.session_state.inventory)
             
             if not price_changes:
                 st.success("No significant price changes detected in the recent import.")
@@ -618,9 +715,9 @@ with tab4:
                 
                 # Format for display
                 display_changes = changes_df.copy()
-                display_changes['old_price'] = display_changes['old_price'].apply(lambda x: f"${x:.2f}")
-                display_changes['new_price'] = display_changes['new_price'].apply(lambda x: f"${x:.2f}")
-                display_changes['percentage_change'] = display_changes['percentage_change'].apply(lambda x: f"{x:+.1f}%")
+                display_changes['old_price'] = display_changes['old_price'].map('${:.2f}'.format)
+                display_changes['new_price'] = display_changes['new_price'].map('${:.2f}'.format)
+                display_changes['percentage_change'] = display_changes['percentage_change'].map('{:+.1f}%'.format)
                 
                 # Rename columns
                 display_changes.columns = ['Item Code', 'Name', 'Old Price', 'New Price', 'Change', 'Unit']
@@ -634,111 +731,39 @@ with tab4:
                 
                 # Check which recipes are affected by the price changes
                 if 'recipes' in st.session_state and st.session_state.recipes:
-                    affected_recipes = []
-                    
-                    for recipe in st.session_state.recipes:
-                        recipe_name = recipe.get('name', 'Unnamed Recipe')
-                        ingredients = recipe.get('ingredients', [])
-                        
-                        # Check if any ingredients in this recipe had price changes
-                        recipe_affected = False
-                        total_impact = 0
-                        affected_ingredients = []
-                        
-                        for ingredient in ingredients:
-                            ing_name = ingredient.get('name', '')
-                            
-                            # Find if this ingredient had a price change
-                            for change in price_changes:
-                                if change['name'].lower() == ing_name.lower():
-                                    recipe_affected = True
-                                    
-                                    # Calculate impact on this ingredient
-                                    old_cost = float(ingredient.get('amount', 0)) * change['old_price']
-                                    new_cost = float(ingredient.get('amount', 0)) * change['new_price']
-                                    impact = new_cost - old_cost
-                                    total_impact += impact
-                                    
-                                    affected_ingredients.append({
-                                        'name': ing_name,
-                                        'impact': impact,
-                                        'percentage_change': change['percentage_change']
-                                    })
-                        
-                        if recipe_affected:
-                            affected_recipes.append({
-                                'name': recipe_name,
-                                'total_impact': total_impact,
-                                'impact_percentage': (total_impact / recipe.get('total_cost', 1)) * 100 if recipe.get('total_cost', 0) > 0 else 0,
-                                'affected_ingredients': affected_ingredients
-                            })
+                    # Reuse the analysis across reruns until the inventory, snapshot or recipes change
+                    affected_recipes, top_recipes, name_to_recipe, impact_rows = price_impact_cached(
+                        lambda: analyze_price_impact(
+                            st.session_state.recipes, price_changes, get_recipe_ingredient_table(), IMPACT_DISPLAY_LIMIT
+                        )
+                    )
                     
-                    if affected_recipes:
-                        # Sort by impact percentage
-                        affected_recipes.sort(key=lambda x: abs(x['impact_percentage']), reverse=True)
-                        
-                        st.write(f"Found {len(affected_recipes)} affected recipes.")
+                    if not affected_recipes.empty:
+                        if len(top_recipes) < len(affected_recipes):
+                            st.write(f"Found {len(affected_recipes)} affected recipes; showing the top {len(top_recipes)}.")
+                        else:
+                            st.write(f"Found {len(affected_recipes)} affected recipes.")
                         
                         # Display affected recipes
-                        impact_df = pd.DataFrame([{
-                            'Recipe': recipe['name'],
-                            'Cost Impact': f"${recipe['total_impact']:.2f}",
-                            'Impact %': f"{recipe['impact_percentage']:+.1f}%",
-                            'Affected Ingredients': len(recipe['affected_ingredients'])
-                        } for recipe in affected_recipes])
-                        
-                        st.dataframe(impact_df, hide_index=True)
+                        impact_df = pd.DataFrame({
+                            'Recipe': top_recipes['name'].to_numpy(),
+                            'Cost Impact': top_recipes['total_impact'].to_numpy(),
+                            'Impact %': top_recipes['impact_percentage'].to_numpy(),
+                            'Affected Ingredients': top_recipes['affected_count'].to_numpy(),
+                            'Severity': top_recipes['severity'].to_numpy()
+                        })
                         
-                        # Detailed impact for selected recipe
-                        selected_recipe = st.selectbox(
-                            "View detailed impact for:",
-                            [recipe['name'] for recipe in affected_recipes]
+                        st.dataframe(
+                            impact_df,
+                            hide_index=True,
+                            column_config={
+                                "Cost Impact": st.column_config.NumberColumn("Cost Impact", format="$%.2f"),
+                                "Impact %": st.column_config.NumberColumn("Impact %", format="%+.1f%%")
+                            }
                         )
                         
-                        # Find the selected recipe
-                        selected_data = next((r for r in affected_recipes if r['name'] == selected_recipe), None)
-                        
-                        if selected_data:
-                            st.write(f"### Impact Details for {selected_recipe}")
-                            
-                            # Show impact metrics
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.metric("Total Cost Impact", f"${selected_data['total_impact']:.2f}")
-                            with col2:
-                                st.metric("Percentage Impact", f"{selected_data['impact_percentage']:+.1f}%")
-                            
-                            # Show affected ingredients
-                            ing_impact_df = pd.DataFrame([{
-                                'Ingredient': ing['name'],
-                                'Cost Impact': f"${ing['impact']:.2f}",
-                                'Price Change': f"{ing['percentage_change']:+.1f}%"
-                            } for ing in selected_data['affected_ingredients']])
-                            
-                            st.dataframe(ing_impact_df, hide_index=True)
-                            
-                            # Recommendations
-                            st.subheader("Recommendations")
-                            
-                            if selected_data['impact_percentage'] > 5:
-                                st.warning("""
-                                The price changes have a significant impact on this recipe's cost.
-                                Consider the following actions:
-                                - Adjust menu prices to maintain profit margins
-                                - Look for alternative suppliers for the affected ingredients
-                                - Consider reformulating the recipe to use less expensive ingredients
-                                """)
-                            elif selected_data['impact_percentage'] > 2:
-                                st.info("""
-                                The price changes have a moderate impact on this recipe's cost.
-                                Consider monitoring these ingredients closely and look for alternatives
-                                if prices continue to increase.
-                                """)
-                            else:
-                                st.success("""
-                                The price changes have a minimal impact on this recipe's cost.
-                                No immediate action is required, but continue to monitor prices.
-                                """)
+                        # Detailed impact for selected recipe; interacting with it reruns only the fragment
+                        show_price_impact_details(affected_recipes, top_recipes, name_to_recipe, impact_rows)
                     else:
                         st.success("No recipes are affected by these price changes.")
                 else:
@@ -4,8 +4,9 @@ import numpy as np
 import os
 import json
 import io
+import plotly.express as px
 from datetime import datetime, timedelta
-from utils.data_processing import process_excel_upload, generate_column_mapping_ui, load_data, save_data
+from utils.data_processing import process_excel_upload, read_excel_cached, generate_column_mapping_ui, load_data, load_data_cached, save_data, load_records, save_parquet_data, session_cached, session_data_key, build_sales_df
 from utils.forecasting import identify_sales_trends, prepare_time_series_data, forecast_ingredient_demand
 from models.sales import analyze_sales, calculate_ingredient_consumption, SalesRecord
 
@@ -18,22 +19,17 @@ st.set_page_config(
 
 # Initialize session state variables if they don't exist
 if 'sales' not in st.session_state:
-    if os.path.exists('data/sales.json'):
-        st.session_state.sales = load_data('data/sales.json')
-    else:
-        st.session_state.sales = []
+    st.session_state.sales = load_records('data/sales.json', 'data/sales.parquet')
 
 if 'recipes' not in st.session_state:
-    if os.path.exists('data/recipes.json'):
-        st.session_state.recipes = load_data('data/recipes.json')
-    else:
-        st.session_state.recipes = []
+    recipes_data = load_data_cached('data/recipes.json')
+    # Saved files wrap the list in a dict with a 'data' field
+    if isinstance(recipes_data, dict) and 'data' in recipes_data:
+        recipes_data = recipes_data['data']
+    st.session_state.recipes = recipes_data
 
 if 'inventory' not in st.session_state:
-    if os.path.exists('data/inventory.json'):
-        st.session_state.inventory = load_data('data/inventory.json')
-    else:
-        st.session_state.inventory = []
+    st.session_state.inventory = load_records('data/inventory.json', 'data/inventory.parquet')
 
 if 'column_mappings' not in st.session_state:
     if os.path.exists('data/column_mappings.json'):
@@ -41,12 +37,86 @@ if 'column_mappings' not in st.session_state:
     else:
         st.session_state.column_mappings = {}
 
+if 'sales_version' not in st.session_state:
+    st.session_state.sales_version = 0
+
 # Create necessary directories if they don't exist
 os.makedirs('data', exist_ok=True)
 
+# Number of growing and of declining items shown in the growth trend table
+GROWTH_TREND_COUNT = 3
+
+# Weekday order for the weekly sales pattern
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
 # Helper function to save sales data
 def save_sales():
     save_data(st.session_state.sales, 'data/sales.json')
+    save_parquet_data(st.session_state.sales, 'data/sales.parquet')
+    # Every sales mutation ends in a save, so this marks cached analyses stale
+    st.session_state.sales_version += 1
+
+# Helper function to memoize an analysis of the sales, recipes and inventory until any of them changes
+def analysis_cached(name, build):
+    return session_cached(f'analysis:{name}', build, session_data_key('sales', 'recipes', 'inventory'))
+
+# Helper function to get the cached sales DataFrame, shared with the reports page
+def get_sales_df():
+    return session_cached('sales_df', lambda: build_sales_df(st.session_state.sales), session_data_key('sales'))
+
+# Helper function to flatten the ingredient consumption analysis into one record per ingredient
+def build_consumption_data():
+    consumption = calculate_ingredient_consumption(st.session_state.sales, st.session_state.recipes)
+    return [
+        {'name': name, 'total_amount': data['total'], 'unit': data['unit'], 'used_in': list(data['recipes'])}
+        for name, data in consumption['consumption_data'].items()
+    ]
+
+# Helper function to identify sales trends with the weekly pattern already ordered for charting
+def build_sales_trends():
+    trends = identify_sales_trends(st.session_state.sales, st.session_state.recipes)
+    
+    # Top three growing items followed by the bottom three, from the growth frame sorted highest first
+    growth_trends = trends['growth_trends']
+    trend_count = min(GROWTH_TREND_COUNT, len(growth_trends))
+    positions = np.r_[np.arange(trend_count), np.arange(len(growth_trends) - 1, len(growth_trends) - 1 - trend_count, -1)]
+    trend_rows = growth_trends.iloc[positions]
+    trends['growth_df'] = pd.DataFrame({
+        'Item': trend_rows['name'].to_numpy(),
+        'Growth %': trend_rows['growth'].map('{:.1f}%'.format).to_numpy(),
+        'Trend': np.repeat(['Growing', 'Declining'], trend_count)
+    })
+    
+    weekly_patterns = trends['weekly_patterns']
+    trends['weekly_df'] = pd.DataFrame({
+        'Day': pd.Categorical(list(weekly_patterns.keys()), categories=DAY_ORDER, ordered=True),
+        'Sales': list(weekly_patterns.values())
+    }).sort_values('Day')
+    return trends
+
+# Helper function to build the profit vs. revenue scatter plot for the top items
+def build_profit_revenue_scatter(revenue_items):
+    # Each revenue record already carries the item's profit, so no join is needed
+    scatter_df = revenue_items[['name', 'revenue', 'profit']].rename(
+        columns={'name': 'Item', 'revenue': 'Revenue', 'profit': 'Profit'}
+    )
+    
+    # Create a custom scatter plot
+    fig = px.scatter(
+        scatter_df,
+        x='Revenue',
+        y='Profit',
+        size='Revenue',
+        text='Item',
+        color='Profit',
+        color_continuous_scale='RdYlGn',
+    )
+    
+    fig.update_traces(
+        textposition='top center',
+        marker=dict(sizemode='area', sizeref=0.1)
+    )
+    return fig
 
 # Helper function to save column mappings
 def save_column_mappings():
@@ -78,7 +148,10 @@ with tab1:
     }
     
     # Perform sales analysis
-    sales_analysis = analyze_sales(st.session_state.sales, period_days[analysis_period])
+    sales_analysis = analysis_cached(
+        f"sales_analysis_{period_days[analysis_period]}",
+        lambda: analyze_sales(st.session_state.sales, period_days[analysis_period])
+    )
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -96,18 +169,11 @@ with tab1:
         # Calculate average daily revenue with safeguards against division by zero
         try:
             if 'sales' in st.session_state and st.session_state.sales:
-                # Get unique dates in the sales data
-                unique_dates = set()
-                for s in st.session_state.sales:
-                    if s.get('date'):
-                        try:
-                            date_obj = pd.to_datetime(s.get('date')).date()
-                            unique_dates.add(date_obj)
-                        except:
-                            pass
+                # Count unique sales days in one pass over the parsed dates (NaT is not counted)
+                unique_dates = get_sales_df()['date'].dt.normalize().nunique()
                 
                 # Calculate days for the average
-                num_days = min(period_days[analysis_period], len(unique_dates)) if unique_dates else 1
+                num_days = min(period_days[analysis_period], unique_dates) if unique_dates else 1
                 
                 # Make sure we don't divide by zero
                 if num_days > 0 and sales_analysis['total_revenue'] > 0:
@@ -125,24 +191,26 @@ with tab1:
     st.subheader("Sales Trend")
     
     if st.session_state.sales:
-        # Convert sales data to DataFrame
-        sales_df = pd.DataFrame(st.session_state.sales)
-        
-        # Convert date to datetime
-        sales_df['date'] = pd.to_datetime(sales_df['date'])
+        # Sales as a DataFrame with parsed dates, built once per sales change
+        sales_df = get_sales_df()
         
         # Filter for the selected period
         cutoff_date = datetime.now() - timedelta(days=period_days[analysis_period])
-        filtered_sales = sales_df[sales_df['date'] >= cutoff_date].copy()
+        filtered_sales = sales_df.loc[sales_df['date'].to_numpy() >= np.datetime64(cutoff_date)]
         
         if not filtered_sales.empty:
-            # Group by date and sum revenue
-            daily_sales = filtered_sales.groupby(filtered_sales['date'].dt.date)['revenue'].sum().reset_index()
-            daily_sales.columns = ['date', 'revenue']
+            # Bin revenue into calendar days on the datetime64 values
+            daily_sales = filtered_sales.set_index('date')['revenue'].resample('D').sum().reset_index()
             
             # Create line chart
             st.line_chart(daily_sales.set_index('date'))
             
+            # Top item records as DataFrames, built once and shared by the charts below
+            top_item_columns = ['name', 'revenue', 'quantity', 'profit']
+            revenue_items = pd.DataFrame.from_records(sales_analysis['top_items_by_revenue'], columns=top_item_columns)
+            quantity_items = pd.DataFrame.from_records(sales_analysis['top_items_by_quantity'], columns=top_item_columns)
+            profit_items = pd.DataFrame.from_records(sales_analysis['top_items_by_profit'], columns=top_item_columns)
+            
             # Top items visualization
             st.subheader("Top Performing Items")
             
@@ -151,12 +219,9 @@ with tab1:
             with col1:
                 st.write("#### Top Items by Revenue")
                 
-                if sales_analysis['top_items_by_revenue']:
+                if not revenue_items.empty:
                     # Create chart data
-                    revenue_data = pd.DataFrame({
-                        'Item': [item['name'] for item in sales_analysis['top_items_by_revenue']],
-                        'Revenue': [item['revenue'] for item in sales_analysis['top_items_by_revenue']]
-                    })
+                    revenue_data = revenue_items[['name', 'revenue']].rename(columns={'name': 'Item', 'revenue': 'Revenue'})
                     
                     st.bar_chart(revenue_data.set_index('Item'))
                 else:
@@ -165,12 +230,9 @@ with tab1:
             with col2:
                 st.write("#### Top Items by Quantity")
                 
-                if sales_analysis['top_items_by_quantity']:
+                if not quantity_items.empty:
                     # Create chart data
-                    quantity_data = pd.DataFrame({
-                        'Item': [item['name'] for item in sales_analysis['top_items_by_quantity']],
-                        'Quantity': [item['quantity'] for item in sales_analysis['top_items_by_quantity']]
-                    })
+                    quantity_data = quantity_items[['name', 'quantity']].rename(columns={'name': 'Item', 'quantity': 'Quantity'})
                     
                     st.bar_chart(quantity_data.set_index('Item'))
                 else:
@@ -184,12 +246,9 @@ with tab1:
             with col1:
                 st.write("#### Top Profitable Items")
                 
-                if sales_analysis['top_items_by_profit']:
+                if not profit_items.empty:
                     # Create chart data
-                    profit_data = pd.DataFrame({
-                        'Item': [item['name'] for item in sales_analysis['top_items_by_profit']],
-                        'Profit': [item['profit'] for item in sales_analysis['top_items_by_profit']]
-                    })
+                    profit_data = profit_items[['name', 'profit']].rename(columns={'name': 'Item', 'profit': 'Profit'})
                     
                     st.bar_chart(profit_data.set_index('Item'))
                 else:
@@ -198,42 +257,11 @@ with tab1:
             with col2:
                 st.write("#### Profit vs. Revenue")
                 
-                # Create scatter plot data for top items
-                if sales_analysis['top_items_by_revenue']:
-                    # Combine revenue and profit data
-                    scatter_data = {}
-                    
-                    for item in sales_analysis['top_items_by_revenue']:
-                        item_name = item['name']
-                        scatter_data[item_name] = {'revenue': item['revenue']}
-                    
-                    for item in sales_analysis['top_items_by_profit']:
-                        item_name = item['name']
-                        if item_name in scatter_data:
-                            scatter_data[item_name]['profit'] = item['profit']
-                    
-                    # Convert to DataFrame
-                    scatter_df = pd.DataFrame([
-                        {'Item': k, 'Revenue': v.get('revenue', 0), 'Profit': v.get('profit', 0)}
-                        for k, v in scatter_data.items()
-                    ])
-                    
-                    # Create a custom scatter plot
-                    import plotly.express as px
-                    
-                    fig = px.scatter(
-                        scatter_df,
-                        x='Revenue',
-                        y='Profit',
-                        size='Revenue',
-                        text='Item',
-                        color='Profit',
-                        color_continuous_scale='RdYlGn',
-                    )
-                    
-                    fig.update_traces(
-                        textposition='top center',
-                        marker=dict(sizemode='area', sizeref=0.1)
+                # Scatter plot of the top items, cached per analysis period
+                if not revenue_items.empty:
+                    fig = analysis_cached(
+                        f"profit_revenue_scatter_{period_days[analysis_period]}",
+                        lambda: build_profit_revenue_scatter(revenue_items)
                     )
                     
                     st.plotly_chart(fig, use_container_width=True)
@@ -342,7 +370,7 @@ with tab2:
                             pass
         else:
             # Preview the data for standard processing
-            df = pd.read_excel(uploaded_file)
+            df = read_excel_cached(uploaded_file.getvalue())
             st.write("Preview of uploaded data:")
             st.dataframe(df.head())
         
@@ -372,7 +400,7 @@ with tab2:
                 
                 # Process the upload
                 with st.spinner("Processing data..."):
-                    result = process_excel_upload(uploaded_file, 'sales', mapping)
+                    result = process_excel_upload(uploaded_file, 'sales', mapping, df=df)
                     
                     if result['status'] == 'success':
                         # Get the processed data
@@ -416,7 +444,7 @@ with tab3:
         st.info("No recipes found. Add recipes to analyze ingredient consumption.")
     else:
         # Calculate ingredient consumption
-        consumption_data = calculate_ingredient_consumption(st.session_state.sales, st.session_state.recipes)
+        consumption_data = analysis_cached('ingredient_consumption', build_consumption_data)
         
         if not consumption_data:
             st.info("No ingredient consumption data available. Make sure your sales data includes items that match your recipes.")
@@ -428,12 +456,16 @@ with tab3:
             st.subheader("Top Consumed Ingredients")
             
             # Convert to DataFrame for charting
-            consumption_df = pd.DataFrame([{
-                'Ingredient': item['name'],
-                'Total Amount': item['total_amount'],
-                'Unit': item['unit'],
-                'Used In': len(item['used_in'])
-            } for item in consumption_data[:10]])
+            # Build the consumption records once and derive the chart and table views from them
+            consumption_base = pd.DataFrame.from_records(consumption_data, columns=['name', 'total_amount', 'unit', 'used_in'])
+            
+            # Records are sorted by total consumption, so the head is the top 10
+            consumption_df = pd.DataFrame({
+                'Ingredient': consumption_base['name'],
+                'Total Amount': consumption_base['total_amount'],
+                'Unit': consumption_base['unit'],
+                'Used In': consumption_base['used_in'].str.len()
+            }).head(10)
             
             # Create chart
             chart_data = consumption_df[['Ingredient', 'Total Amount']].set_index('Ingredient')
@@ -442,11 +474,13 @@ with tab3:
             # Display detailed consumption table
             st.subheader("Detailed Consumption")
             
-            consumption_table = pd.DataFrame([{
-                'Ingredient': item['name'],
-                'Total Amount': f"{item['total_amount']:.2f} {item['unit']}",
-                'Used In': ', '.join(item['used_in'][:3]) + (f" +{len(item['used_in'])-3} more" if len(item['used_in']) > 3 else "")
-            } for item in consumption_data])
+            consumption_table = pd.DataFrame({
+                'Ingredient': consumption_base['name'],
+                'Total Amount': consumption_base['total_amount'].map('{:.2f}'.format) + ' ' + consumption_base['unit'].astype(str),
+                'Used In': consumption_base['used_in'].apply(
+                    lambda recipes: ', '.join(recipes[:3]) + (f" +{len(recipes)-3} more" if len(recipes) > 3 else "")
+                )
+            })
             
             st.dataframe(consumption_table, hide_index=True)
             
@@ -457,69 +491,57 @@ with tab3:
             if not st.session_state.inventory:
                 st.info("No inventory data available. Add inventory data to compare with consumption.")
             else:
-                # Create a mapping of inventory items to their stock levels
-                inventory_dict = {item.get('name', ''): item for item in st.session_state.inventory}
+                # Join consumption with inventory stock on ingredient name; the last inventory item wins for duplicate names
+                inventory_df = (
+                    pd.DataFrame(st.session_state.inventory)
+                    .reindex(columns=['name', 'stock_level', 'unit'])
+                    .rename(columns={'unit': 'inv_unit'})
+                    .drop_duplicates('name', keep='last')
+                )
+                matched = consumption_base[['name', 'total_amount', 'unit']].merge(inventory_df, on='name', how='inner')
                 
-                # Compare consumption with inventory
-                comparison_data = []
+                consumed = matched['total_amount'].to_numpy(dtype=np.float64)
+                current_stock = pd.to_numeric(matched['stock_level'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+                inv_units = matched['inv_unit'].fillna('').astype(str)
                 
-                for item in consumption_data:
-                    ing_name = item['name']
-                    consumed_amount = item['total_amount']
-                    unit = item['unit']
-                    
-                    # Find in inventory
-                    inv_item = inventory_dict.get(ing_name)
-                    
-                    if inv_item:
-                        current_stock = inv_item.get('stock_level', 0)
-                        inv_unit = inv_item.get('unit', '')
-                        
-                        # Check if units match
-                        unit_match = unit.lower() == inv_unit.lower()
-                        
-                        comparison_data.append({
-                            'Ingredient': ing_name,
-                            'Consumed': consumed_amount,
-                            'Unit': unit,
-                            'Current Stock': current_stock,
-                            'Inventory Unit': inv_unit,
-                            'Units Match': unit_match,
-                            'Days Until Depletion': current_stock / (consumed_amount / 30) if consumed_amount > 0 and unit_match else None
-                        })
+                # Check if units match
+                unit_match = (matched['unit'].astype(str).str.lower() == inv_units.str.lower()).to_numpy()
                 
-                if comparison_data:
-                    # Convert to DataFrame
-                    comparison_df = pd.DataFrame(comparison_data)
-                    
-                    # Format for display
-                    display_df = comparison_df.copy()
-                    display_df['Consumed'] = display_df['Consumed'].apply(lambda x: f"{x:.2f}")
-                    display_df['Current Stock'] = display_df['Current Stock'].apply(lambda x: f"{x:.2f}")
-                    display_df['Days Until Depletion'] = display_df['Days Until Depletion'].apply(
-                        lambda x: f"{x:.0f} days" if pd.notna(x) else "N/A"
+                # Days of stock left at the consumption rate, where the rate is known and comparable
+                days_left = np.full(len(matched), np.nan)
+                np.divide(current_stock, consumed / 30, out=days_left, where=unit_match & (consumed > 0))
+                
+                comparison_df = pd.DataFrame({
+                    'Ingredient': matched['name'].to_numpy(),
+                    'Consumed': consumed,
+                    'Unit': matched['unit'].to_numpy(),
+                    'Current Stock': current_stock,
+                    'Inventory Unit': inv_units.to_numpy(),
+                    'Units Match': unit_match,
+                    'Days Until Depletion': days_left
+                })
+                
+                if not comparison_df.empty:
+                    # Highlight items with low days until depletion from the numeric column
+                    days_until_depletion = comparison_df['Days Until Depletion'].to_numpy()
+                    depletion_styles = np.where(
+                        days_until_depletion < 7, 'background-color: #FFCCCC',
+                        np.where(days_until_depletion < 14, 'background-color: #FFFFCC', '')
+                    )
+                    styled_df = comparison_df.style.apply(
+                        lambda _: depletion_styles, subset=['Days Until Depletion']
+                    ).format(
+                        {'Consumed': '{:.2f}', 'Current Stock': '{:.2f}', 'Days Until Depletion': '{:.0f} days'},
+                        na_rep="N/A"
                     )
-                    
-                    # Highlight items with low days until depletion
-                    def highlight_low_stock(val):
-                        try:
-                            days = float(val.split()[0])
-                            if days < 7:
-                                return 'background-color: #FFCCCC'
-                            elif days < 14:
-                                return 'background-color: #FFFFCC'
-                            else:
-                                return ''
-                        except:
-                            return ''
                     
                     # Display styled DataFrame
                     st.dataframe(
-                        display_df,
+                        styled_df,
                         hide_index=True,
                         column_config={
                             "Units Match": st.column_config.CheckboxColumn("Units Match", help="Whether the units in recipes match inventory"),
-                            "Days Until Depletion": st.column_config.TextColumn("Days Until Depletion", help="Based on recent consumption rate")
+                            "Days Until Depletion": st.column_config.NumberColumn("Days Until Depletion", help="Based on recent consumption rate")
                         }
                     )
                     
@@ -542,10 +564,13 @@ with tab4:
         st.info("Both sales data and recipes are required for demand forecasting. Please import your data first.")
     else:
         # Prepare time series data for forecasting
-        time_series_data = prepare_time_series_data(
-            st.session_state.sales, 
-            st.session_state.recipes,
-            st.session_state.inventory
+        time_series_data = analysis_cached(
+            'time_series_data',
+            lambda: prepare_time_series_data(
+                st.session_state.sales, 
+                st.session_state.recipes,
+                st.session_state.inventory
+            )
         )
         
         if time_series_data.empty:
@@ -556,7 +581,10 @@ with tab4:
             
             # Generate forecast
             with st.spinner("Generating forecast..."):
-                forecast_data = forecast_ingredient_demand(time_series_data, forecast_days)
+                forecast_data = analysis_cached(
+                    f"forecast_{forecast_days}",
+                    lambda: forecast_ingredient_demand(time_series_data, forecast_days)
+                )
             
             if forecast_data.empty:
                 st.error("Failed to generate forecast. Please try again or check your data.")
@@ -566,12 +594,8 @@ with tab4:
                 # Display forecast
                 st.subheader("Ingredient Demand Forecast")
                 
-                # Convert dates to string for display
-                forecast_display = forecast_data.copy()
-                forecast_display['date'] = forecast_display['date'].dt.strftime('%Y-%m-%d')
-                
                 # Group by ingredient and calculate average daily demand
-                avg_demand = forecast_display.groupby('ingredient')['forecasted_quantity'].mean().reset_index()
+                avg_demand = forecast_data.groupby('ingredient', observed=True, sort=False)['forecasted_quantity'].mean().reset_index()
                 avg_demand.columns = ['Ingredient', 'Average Daily Demand']
                 
                 # Sort by average demand (highest first)
@@ -586,11 +610,12 @@ with tab4:
                     avg_demand['Ingredient'].tolist()
                 )
                 
-                # Filter forecast for selected ingredient
-                ingredient_forecast = forecast_display[forecast_display['ingredient'] == selected_ingredient].copy()
-                
-                # Prepare for visualization
-                ingredient_forecast['Forecasted Quantity'] = ingredient_forecast['forecasted_quantity']
+                # Filter forecast for selected ingredient and convert only its dates to string for display
+                ingredient_forecast = forecast_data[forecast_data['ingredient'] == selected_ingredient]
+                ingredient_forecast = ingredient_forecast.assign(
+                    date=ingredient_forecast['date'].dt.strftime('%Y-%m-%d'),
+                    **{'Forecasted Quantity': ingredient_forecast['forecasted_quantity']}
+                )
                 
                 # Create a line chart
                 st.line_chart(ingredient_forecast.set_index('date')['Forecasted Quantity'])
@@ -603,7 +628,7 @@ with tab4:
                 st.subheader("Sales Trends Analysis")
                 
                 with st.spinner("Analyzing sales trends..."):
-                    trends = identify_sales_trends(st.session_state.sales, st.session_state.recipes)
+                    trends = analysis_cached('sales_trends', build_sales_trends)
                 
                 if trends['top_sellers']:
                     col1, col2 = st.columns(2)
@@ -621,25 +646,7 @@ with tab4:
                     with col2:
                         st.write("#### Growth Trend")
                         
-                        growth_df = pd.DataFrame()
-                        
-                        if trends['growing_items']:
-                            growing_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Growth %': f"{item['growth']:.1f}%"
-                            } for item in trends['growing_items']])
-                            
-                            growing_df['Trend'] = 'Growing'
-                            growth_df = pd.concat([growth_df, growing_df])
-                        
-                        if trends['declining_items']:
-                            declining_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Growth %': f"{item['growth']:.1f}%"
-                            } for item in trends['declining_items']])
-                            
-                            declining_df['Trend'] = 'Declining'
-                            growth_df = pd.concat([growth_df, declining_df])
+                        growth_df = trends['growth_df']
                         
                         if not growth_df.empty:
                             st.dataframe(growth_df, hide_index=True)
@@ -650,15 +657,7 @@ with tab4:
                     if trends['weekly_patterns']:
                         st.write("#### Weekly Sales Pattern")
                         
-                        weekly_df = pd.DataFrame({
-                            'Day': list(trends['weekly_patterns'].keys()),
-                            'Sales': list(trends['weekly_patterns'].values())
-                        })
-                        
-                        # Ensure correct order of days
-                        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                        weekly_df['Day'] = pd.Categorical(weekly_df['Day'], categories=day_order, ordered=True)
-                        weekly_df = weekly_df.sort_values('Day')
+                        weekly_df = trends['weekly_df']
                         
                         st.bar_chart(weekly_df.set_index('Day'))
                         
@@ -680,29 +679,42 @@ with tab4:
                     st.info("Please add inventory data to get ordering recommendations.")
                 else:
                     with st.spinner("Generating recommendations..."):
-                        recommendations = recommend_inventory_levels(
-                            st.session_state.inventory,
-                            forecast_data,
-                            lead_time_days=2,
-                            buffer_percentage=20
+                        recommendations = analysis_cached(
+                            f"recommendations_{forecast_days}",
+                            lambda: recommend_inventory_levels(
+                                st.session_state.inventory,
+                                forecast_data,
+                                lead_time_days=2,
+                                buffer_percentage=20
+                            )
                         )
                     
                     if recommendations:
                         # Display recommendations
-                        recom_df = pd.DataFrame([{
-                            'Ingredient': item['ingredient'],
-                            'Current Stock': item['current_stock'],
-                            'Recommended Stock': f"{item['recommended_stock']:.2f}",
-                            'Order Quantity': f"{item['order_quantity']:.2f}"
-                        } for item in recommendations])
+                        # Build typed columns directly rather than inferring dtypes row by row
+                        recom_count = len(recommendations)
+                        recom_df = pd.DataFrame({
+                            'Ingredient': [item['ingredient'] for item in recommendations],
+                            'Current Stock': np.fromiter((item['current_stock'] for item in recommendations), dtype=np.float64, count=recom_count),
+                            'Recommended Stock': np.fromiter((item['recommended_stock'] for item in recommendations), dtype=np.float64, count=recom_count).round(2),
+                            'Order Quantity': np.fromiter((item['order_quantity'] for item in recommendations), dtype=np.float64, count=recom_count).round(2)
+                        })
                         
-                        st.dataframe(recom_df, hide_index=True)
+                        st.dataframe(
+                            recom_df,
+                            hide_index=True,
+                            column_config={
+                                "Recommended Stock": st.column_config.NumberColumn(format="%.2f"),
+                                "Order Quantity": st.column_config.NumberColumn(format="%.2f")
+                            }
+                        )
                         
                         # Download recommendations as CSV
-                        csv = recom_df.to_csv(index=False)
+                        csv_buffer = io.BytesIO()
+                        recom_df.to_csv(csv_buffer, index=False, lineterminator='\n')
                         st.download_button(
                             label="Download Ordering Recommendations",
-                            data=csv,
+                            data=csv_buffer.getvalue(),
                             file_name="ordering_recommendations.csv",
                             mime="text/csv"
                         )
@@ -4,9 +4,10 @@ import numpy as np
 import os
 import json
 import io
+import heapq
 from datetime import datetime, timedelta
-from utils.openai_utils import query_ai_assistant, analyze_price_changes, generate_natural_language_report
-from utils.data_processing import load_data, save_data
+from utils.openai_utils import query_ai_assistant, query_ai_assistant_batch, analyze_price_changes, generate_natural_language_report
+from utils.data_processing import load_data_cached, save_data, load_records, session_cached, session_data_key, build_sales_df
 from utils.forecasting import identify_sales_trends, prepare_time_series_data, forecast_ingredient_demand
 
 # Set page configuration
@@ -18,26 +19,187 @@ st.set_page_config(
 
 # Initialize session state variables if they don't exist
 if 'recipes' not in st.session_state:
-    if os.path.exists('data/recipes.json'):
-        st.session_state.recipes = load_data('data/recipes.json')
-    else:
-        st.session_state.recipes = []
+    recipes_data = load_data_cached('data/recipes.json')
+    # Saved files wrap the list in a dict with a 'data' field
+    if isinstance(recipes_data, dict) and 'data' in recipes_data:
+        recipes_data = recipes_data['data']
+    st.session_state.recipes = recipes_data
 
 if 'inventory' not in st.session_state:
-    if os.path.exists('data/inventory.json'):
-        st.session_state.inventory = load_data('data/inventory.json')
-    else:
-        st.session_state.inventory = []
+    st.session_state.inventory = load_records('data/inventory.json', 'data/inventory.parquet')
 
 if 'sales' not in st.session_state:
-    if os.path.exists('data/sales.json'):
-        st.session_state.sales = load_data('data/sales.json')
-    else:
-        st.session_state.sales = []
+    st.session_state.sales = load_records('data/sales.json', 'data/sales.parquet')
 
 # Create necessary directories if they don't exist
 os.makedirs('data', exist_ok=True)
 
+# Helper function to memoize a report computation until the sales, recipes or inventory change
+def report_cached(name, build):
+    return session_cached(f'report:{name}', build, session_data_key('sales', 'recipes', 'inventory'))
+
+# Helper function to get the cached sales DataFrame, shared with the sales page; callers must not modify it in place
+def get_sales_df():
+    return session_cached('sales_df', lambda: build_sales_df(st.session_state.sales), session_data_key('sales'))
+
+# Helper function to total ingredient costs across all recipes by ingredient name
+def build_ingredient_costs():
+    ingredient_rows = pd.DataFrame(
+        [
+            (ingredient.get('name', ''), ingredient.get('cost', 0))
+            for recipe in st.session_state.recipes
+            for ingredient in recipe.get('ingredients', [])
+        ],
+        columns=['name', 'cost']
+    )
+    ingredient_rows['cost'] = pd.to_numeric(ingredient_rows['cost'], errors='coerce').fillna(0)
+    return ingredient_rows.groupby('name', sort=False)['cost'].sum()
+
+# Helper function to index inventory items by lowercased name, keeping the first item for duplicate names
+def build_inventory_lookup():
+    inventory_lookup = {}
+    for item in st.session_state.inventory:
+        inventory_lookup.setdefault(item.get('name', '').lower(), item)
+    return inventory_lookup
+
+# Helper function to combine per-item sales totals with recipe costs for the menu performance matrix
+def build_menu_matrix(sales_df):
+    # Total quantity and revenue sold for each item
+    item_totals = (
+        sales_df.reindex(columns=['item_name', 'quantity', 'revenue'])
+        .groupby('item_name')[['quantity', 'revenue']]
+        .sum()
+    )
+    
+    # Get average quantity to determine popularity threshold
+    avg_quantity = item_totals['quantity'].mean()
+    
+    # Keep only items with a matching recipe; the last recipe wins for duplicate names
+    recipe_costs = pd.Series(
+        {recipe.get('name', ''): recipe.get('total_cost', 0) for recipe in st.session_state.recipes},
+        dtype=object
+    )
+    menu_df = item_totals.join(
+        pd.to_numeric(recipe_costs, errors='coerce').fillna(0).rename('total_cost'),
+        how='inner'
+    ).rename_axis('name').reset_index()
+    
+    quantity = menu_df['quantity'].to_numpy(dtype=np.float64)
+    revenue = menu_df['revenue'].to_numpy(dtype=np.float64)
+    cost = menu_df['total_cost'].to_numpy(dtype=np.float64) * quantity
+    
+    # Profit is only known for items with revenue
+    has_revenue = revenue > 0
+    profit = np.where(has_revenue, revenue - cost, 0.0)
+    profit_margin = np.zeros(len(menu_df))
+    np.divide(profit * 100, revenue, out=profit_margin, where=has_revenue)
+    
+    is_popular = quantity > avg_quantity
+    is_profitable = profit_margin > 20  # Adjust threshold as needed
+    
+    menu_df = menu_df.assign(
+        cost=cost,
+        profit=profit,
+        profit_margin=profit_margin,
+        category=np.select(
+            [is_profitable & is_popular, is_profitable & ~is_popular, ~is_profitable & is_popular],
+            ['Stars', 'Puzzles', 'Workhorses'],
+            default='Dogs'
+        )
+    )
+    return menu_df, avg_quantity
+
+# Row limits for each section of the AI context summary
+LLM_SUMMARY_TOP_RECIPES = 20
+LLM_SUMMARY_TOP_ITEMS = 20
+LLM_SUMMARY_TOP_INVENTORY = 10
+LLM_SUMMARY_MONTHS = 12
+
+# Suggested questions for the AI chat as (id, button label, question)
+SUGGESTED_QUESTIONS = [
+    ("expensive_recipes", "What are my most expensive recipes?", "What are my most expensive recipes and how can I reduce their cost?"),
+    ("profit_margin", "Which menu items have the highest profit margin?", "Which menu items have the highest profit margin based on my recipes and sales data?"),
+    ("order_soon", "What ingredients should I order soon?", "Based on my inventory levels and recent sales, what ingredients should I order soon?"),
+    ("optimize_menu", "How can I optimize my menu?", "How can I optimize my menu based on sales data, ingredient costs, and profit margins?")
+]
+
+# Menu engineering categories for the matrix tabs as (category, heading, description)
+MENU_CATEGORIES = [
+    ("Stars", "High Profit, High Popularity", "These items are your best performers. Promote them prominently."),
+    ("Puzzles", "High Profit, Low Popularity", "These items are profitable but need promotion to increase sales."),
+    ("Workhorses", "Low Profit, High Popularity", "These items are popular but not very profitable. Look for ways to increase margins."),
+    ("Dogs", "Low Profit, Low Popularity", "Consider removing these items from your menu or revamping them.")
+]
+
+# Helper function to answer all suggested questions with one AI request; only successful API calls are cached
+def build_suggested_answers():
+    context = report_cached('llm_summary', build_llm_summary)
+    return query_ai_assistant_batch(
+        {question_id: question for question_id, _, question in SUGGESTED_QUESTIONS},
+        context
+    )
+
+# Helper function to condense recipes, sales and inventory into a compact context for AI prompts
+def build_llm_summary():
+    recipes = st.session_state.recipes
+    inventory = st.session_state.inventory
+    sales_df = get_sales_df()
+    
+    summary = {
+        "recipes_count": len(recipes),
+        "inventory_count": len(inventory),
+        "sales_count": len(sales_df)
+    }
+    
+    # Costliest recipes with their ingredient names
+    recipe_df = pd.DataFrame({
+        'name': [recipe.get('name', '') for recipe in recipes],
+        'total_cost': pd.to_numeric(pd.Series([recipe.get('total_cost', 0) for recipe in recipes], dtype=object), errors='coerce').fillna(0),
+        'ingredients': [
+            ", ".join(str(ingredient.get('name', '')) for ingredient in recipe.get('ingredients', []))
+            for recipe in recipes
+        ]
+    })
+    summary["top_recipes_by_cost"] = recipe_df.nlargest(LLM_SUMMARY_TOP_RECIPES, 'total_cost').round(2).to_dict('records')
+    
+    # Best-selling items and the menu items with the highest margins
+    sales_totals = (
+        sales_df.reindex(columns=['item_name', 'quantity', 'revenue', 'cost'])
+        .groupby('item_name', sort=False)[['quantity', 'revenue', 'cost']]
+        .sum()
+    )
+    summary["top_selling_items"] = (
+        sales_totals.nlargest(LLM_SUMMARY_TOP_ITEMS, 'quantity').round(2).rename_axis('name').reset_index().to_dict('records')
+    )
+    menu_df, _ = report_cached('menu_matrix', lambda: build_menu_matrix(sales_df))
+    summary["top_items_by_margin"] = (
+        menu_df.nlargest(LLM_SUMMARY_TOP_RECIPES, 'profit_margin')[['name', 'quantity', 'revenue', 'cost', 'profit_margin', 'category']]
+        .round(2)
+        .to_dict('records')
+    )
+    
+    # Most valuable inventory on hand
+    inventory_df = pd.DataFrame(inventory).reindex(columns=['name', 'price', 'unit', 'stock_level'])
+    inventory_df['value'] = (
+        pd.to_numeric(inventory_df['price'], errors='coerce').fillna(0)
+        * pd.to_numeric(inventory_df['stock_level'], errors='coerce').fillna(0)
+    )
+    summary["top_inventory_by_value"] = inventory_df.nlargest(LLM_SUMMARY_TOP_INVENTORY, 'value').round(2).to_dict('records')
+    
+    # Monthly sales cost and revenue over the most recent months
+    sales_months = sales_df['date'].dt.to_period('M')
+    monthly = (
+        sales_df.reindex(columns=['cost', 'revenue'])
+        .groupby(sales_months)
+        .sum()
+        .tail(LLM_SUMMARY_MONTHS)
+        .round(2)
+    )
+    monthly.index = monthly.index.astype(str)
+    summary["monthly_trend"] = monthly.rename_axis('month').reset_index().to_dict('records')
+    
+    return summary
+
 # Main page header
 st.title("📝 Reports and Insights")
 st.markdown("AI-powered analysis and reports to optimize your hotel's cost control")
@@ -63,15 +225,15 @@ with tab1:
                 "recipes_count": len(st.session_state.recipes),
                 "inventory_count": len(st.session_state.inventory),
                 "sales_count": len(st.session_state.sales),
-                "top_recipes": sorted(st.session_state.recipes, key=lambda x: x.get('total_cost', 0), reverse=True)[:5] if st.session_state.recipes else [],
-                "top_inventory": sorted(st.session_state.inventory, key=lambda x: x.get('price', 0) * x.get('stock_level', 0), reverse=True)[:5] if st.session_state.inventory else [],
-                "recent_sales": sorted(st.session_state.sales, key=lambda x: x.get('date', ''), reverse=True)[:10] if st.session_state.sales else []
+                "top_recipes": heapq.nlargest(5, st.session_state.recipes, key=lambda x: x.get('total_cost', 0)),
+                "top_inventory": heapq.nlargest(5, st.session_state.inventory, key=lambda x: x.get('price', 0) * x.get('stock_level', 0)),
+                "recent_sales": heapq.nlargest(10, st.session_state.sales, key=lambda x: x.get('date', ''))
             }
             
             # Add sales analysis if available
             if st.session_state.sales:
                 # Find top selling items
-                sales_df = pd.DataFrame(st.session_state.sales)
+                sales_df = get_sales_df()
                 if not sales_df.empty and 'item_name' in sales_df.columns and 'quantity' in sales_df.columns:
                     top_sellers = sales_df.groupby('item_name')['quantity'].sum().sort_values(ascending=False).head(5)
                     context["top_selling_items"] = [{"name": k, "quantity": int(v)} for k, v in top_sellers.items()]
@@ -86,55 +248,15 @@ with tab1:
     # Recent questions
     st.subheader("Suggested Questions")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("What are my most expensive recipes?"):
-            with st.spinner("Analyzing your data..."):
-                context = {
-                    "recipes": sorted(st.session_state.recipes, key=lambda x: x.get('total_cost', 0), reverse=True)[:10] if st.session_state.recipes else []
-                }
-                response = query_ai_assistant("What are my most expensive recipes and how can I reduce their cost?", context)
-                st.markdown("### AI Response")
-                st.markdown(response)
-    
-    with col2:
-        if st.button("Which menu items have the highest profit margin?"):
-            with st.spinner("Analyzing your data..."):
-                # Combine recipe and sales data for profit analysis
-                context = {
-                    "recipes": st.session_state.recipes,
-                    "sales": st.session_state.sales[:100] if len(st.session_state.sales) > 100 else st.session_state.sales
-                }
-                response = query_ai_assistant("Which menu items have the highest profit margin based on my recipes and sales data?", context)
-                st.markdown("### AI Response")
-                st.markdown(response)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("What ingredients should I order soon?"):
-            with st.spinner("Analyzing your data..."):
-                context = {
-                    "inventory": st.session_state.inventory,
-                    "sales": st.session_state.sales[-100:] if len(st.session_state.sales) > 100 else st.session_state.sales,
-                    "recipes": st.session_state.recipes
-                }
-                response = query_ai_assistant("Based on my inventory levels and recent sales, what ingredients should I order soon?", context)
-                st.markdown("### AI Response")
-                st.markdown(response)
-    
-    with col2:
-        if st.button("How can I optimize my menu?"):
-            with st.spinner("Analyzing your data..."):
-                context = {
-                    "recipes": st.session_state.recipes,
-                    "sales": st.session_state.sales,
-                    "inventory": st.session_state.inventory
-                }
-                response = query_ai_assistant("How can I optimize my menu based on sales data, ingredient costs, and profit margins?", context)
-                st.markdown("### AI Response")
-                st.markdown(response)
+    # Two buttons per row; a click answers every suggested question in one request, which later clicks reuse from the prompt cache
+    for question_row in (SUGGESTED_QUESTIONS[:2], SUGGESTED_QUESTIONS[2:]):
+        for column, (question_id, label, question) in zip(st.columns(2), question_row):
+            with column:
+                if st.button(label):
+                    with st.spinner("Analyzing your data..."):
+                        suggested_answers = build_suggested_answers()
+                        st.markdown("### AI Response")
+                        st.markdown(suggested_answers[question_id])
 
 with tab2:
     st.subheader("Cost Insights")
@@ -144,29 +266,27 @@ with tab2:
     if not st.session_state.recipes:
         st.info("No recipe data available. Please add recipes to see cost insights.")
     else:
-        # Calculate cost metrics
-        total_recipe_cost = sum(recipe.get('total_cost', 0) for recipe in st.session_state.recipes)
-        avg_recipe_cost = total_recipe_cost / len(st.session_state.recipes) if st.session_state.recipes else 0
-        
-        # Recipes by cost category
-        cost_categories = {
-            'Low': 0,
-            'Medium': 0,
-            'High': 0
-        }
+        # Calculate cost metrics from one array of recipe costs
+        recipe_costs = np.fromiter(
+            (recipe.get('total_cost', 0) for recipe in st.session_state.recipes),
+            dtype=np.float64,
+            count=len(st.session_state.recipes)
+        )
+        total_recipe_cost = recipe_costs.sum()
+        avg_recipe_cost = recipe_costs.mean()
         
         # Define thresholds (customize based on your business)
         low_threshold = avg_recipe_cost * 0.7
         high_threshold = avg_recipe_cost * 1.3
         
-        for recipe in st.session_state.recipes:
-            cost = recipe.get('total_cost', 0)
-            if cost < low_threshold:
-                cost_categories['Low'] += 1
-            elif cost > high_threshold:
-                cost_categories['High'] += 1
-            else:
-                cost_categories['Medium'] += 1
+        # Recipes by cost category
+        low_count = np.count_nonzero(recipe_costs < low_threshold)
+        high_count = np.count_nonzero(recipe_costs > high_threshold)
+        cost_categories = {
+            'Low': low_count,
+            'Medium': len(recipe_costs) - low_count - high_count,
+            'High': high_count
+        }
         
         # Display cost distribution
         st.write("### Recipe Cost Distribution")
@@ -177,11 +297,11 @@ with tab2:
             st.metric("Average Recipe Cost", f"${avg_recipe_cost:.2f}")
         
         with col2:
-            highest_cost = max(recipe.get('total_cost', 0) for recipe in st.session_state.recipes) if st.session_state.recipes else 0
+            highest_cost = recipe_costs.max()
             st.metric("Highest Recipe Cost", f"${highest_cost:.2f}")
         
         with col3:
-            lowest_cost = min(recipe.get('total_cost', 0) for recipe in st.session_state.recipes) if st.session_state.recipes else 0
+            lowest_cost = recipe_costs.min()
             st.metric("Lowest Recipe Cost", f"${lowest_cost:.2f}")
         
         # Create chart for cost categories
@@ -195,29 +315,17 @@ with tab2:
         # Ingredient cost analysis
         st.write("### Key Cost Contributors")
         
-        # Extract ingredient costs across all recipes
-        ingredient_costs = {}
+        # Total ingredient costs across all recipes
+        ingredient_costs = report_cached('ingredient_costs', build_ingredient_costs)
         
-        for recipe in st.session_state.recipes:
-            for ingredient in recipe.get('ingredients', []):
-                name = ingredient.get('name', '')
-                cost = ingredient.get('cost', 0)
-                
-                if name not in ingredient_costs:
-                    ingredient_costs[name] = 0
-                
-                ingredient_costs[name] += cost
-        
-        # Sort ingredients by total cost
-        sorted_ingredients = sorted(ingredient_costs.items(), key=lambda x: x[1], reverse=True)
-        
-        if sorted_ingredients:
+        if not ingredient_costs.empty:
             # Display top cost contributors
-            top_ingredients = sorted_ingredients[:10]
+            top_costs = ingredient_costs.nlargest(10)
+            top_ingredients = list(top_costs.items())
             
             ing_df = pd.DataFrame({
-                'Ingredient': [ing[0] for ing in top_ingredients],
-                'Total Cost': [ing[1] for ing in top_ingredients]
+                'Ingredient': top_costs.index,
+                'Total Cost': top_costs.to_numpy()
             })
             
             st.bar_chart(ing_df.set_index('Ingredient'))
@@ -228,25 +336,27 @@ with tab2:
             # Find ingredients with price changes
             price_changes = []
             
+            inventory_lookup = report_cached('inventory_by_name', build_inventory_lookup)
+            
             for ingredient_name, _ in top_ingredients:
                 # Find this ingredient in inventory
-                for item in st.session_state.inventory:
-                    if item.get('name', '').lower() == ingredient_name.lower():
-                        # Check if it has price history
-                        price_history = item.get('price_history', [])
-                        if price_history:
-                            current_price = item.get('price', 0)
-                            old_price = price_history[-1].get('price', 0)
+                item = inventory_lookup.get(ingredient_name.lower())
+                if item:
+                    # Check if it has price history
+                    price_history = item.get('price_history', [])
+                    if price_history:
+                        current_price = item.get('price', 0)
+                        old_price = price_history[-1].get('price', 0)
+                        
+                        if old_price > 0:
+                            change_pct = ((current_price - old_price) / old_price) * 100
                             
-                            if old_price > 0:
-                                change_pct = ((current_price - old_price) / old_price) * 100
-                                
-                                price_changes.append({
-                                    'name': ingredient_name,
-                                    'old_price': old_price,
-                                    'current_price': current_price,
-                                    'change_pct': change_pct
-                                })
+                            price_changes.append({
+                                'name': ingredient_name,
+                                'old_price': old_price,
+                                'current_price': current_price,
+                                'change_pct': change_pct
+                            })
             
             if price_changes:
                 # Sort by percentage change (largest increases first)
@@ -274,10 +384,13 @@ with tab2:
                 
                 # Use AI to analyze impact
                 with st.spinner("Analyzing price change impact..."):
-                    price_impact = analyze_price_changes(
-                        [item for item in st.session_state.inventory if item.get('price_history', [])],
-                        st.session_state.inventory,
-                        st.session_state.recipes
+                    price_impact = report_cached(
+                        'price_impact',
+                        lambda: analyze_price_changes(
+                            [item for item in st.session_state.inventory if item.get('price_history', [])],
+                            st.session_state.inventory,
+                            st.session_state.recipes
+                        )
                     )
                 
                 if "error" not in price_impact:
@@ -306,15 +419,11 @@ with tab2:
                 st.write("### Cost Trend Analysis")
                 
                 # Convert sales data to DataFrame
-                sales_df = pd.DataFrame(st.session_state.sales)
+                sales_df = get_sales_df()
                 
                 if not sales_df.empty and 'date' in sales_df.columns and 'cost' in sales_df.columns:
-                    # Convert date to datetime
-                    sales_df['date'] = pd.to_datetime(sales_df['date'])
-                    
                     # Group by month and calculate average cost
-                    sales_df['month'] = sales_df['date'].dt.to_period('M')
-                    monthly_cost = sales_df.groupby('month')['cost'].mean().reset_index()
+                    monthly_cost = sales_df.groupby(sales_df['date'].dt.to_period('M').rename('month'))['cost'].mean().reset_index()
                     monthly_cost['month'] = monthly_cost['month'].astype(str)
                     
                     # Create line chart
@@ -354,85 +463,25 @@ with tab3:
             # We need to categorize items by profit and popularity
             
             # Convert sales data to DataFrame
-            sales_df = pd.DataFrame(st.session_state.sales)
+            sales_df = get_sales_df()
             
             if not sales_df.empty and 'item_name' in sales_df.columns and 'quantity' in sales_df.columns:
-                # Calculate total quantity sold for each item
-                item_quantity = sales_df.groupby('item_name')['quantity'].sum().reset_index()
-                
-                # Get average quantity to determine popularity threshold
-                avg_quantity = item_quantity['quantity'].mean()
-                
-                # Create recipe lookup
-                recipe_lookup = {recipe.get('name', ''): recipe for recipe in st.session_state.recipes}
-                
-                # Combine sales and recipe data
-                menu_items = []
-                
-                for _, row in item_quantity.iterrows():
-                    item_name = row['item_name']
-                    quantity = row['quantity']
-                    
-                    # Find matching recipe
-                    recipe = recipe_lookup.get(item_name)
-                    
-                    if recipe:
-                        # Calculate profit if we have revenue data
-                        profit = 0
-                        profit_margin = 0
-                        
-                        # Find revenue from sales
-                        item_revenue = sales_df[sales_df['item_name'] == item_name]['revenue'].sum()
-                        item_cost = recipe.get('total_cost', 0) * quantity
-                        
-                        if item_revenue > 0:
-                            profit = item_revenue - item_cost
-                            profit_margin = (profit / item_revenue) * 100
-                        
-                        menu_items.append({
-                            'name': item_name,
-                            'quantity': quantity,
-                            'revenue': item_revenue,
-                            'cost': item_cost,
-                            'profit': profit,
-                            'profit_margin': profit_margin,
-                            'is_popular': quantity > avg_quantity,
-                            'is_profitable': profit_margin > 20  # Adjust threshold as needed
-                        })
+                # Totals per sold item joined with recipe costs, cached until the data changes
+                menu_df, avg_quantity = report_cached('menu_matrix', lambda: build_menu_matrix(sales_df))
                 
-                if menu_items:
-                    # Create menu matrix data
-                    matrix_data = {
-                        'Stars': [],  # High profit, high popularity
-                        'Puzzles': [],  # High profit, low popularity
-                        'Workhorses': [],  # Low profit, high popularity
-                        'Dogs': []  # Low profit, low popularity
-                    }
-                    
-                    for item in menu_items:
-                        if item['is_profitable'] and item['is_popular']:
-                            matrix_data['Stars'].append(item)
-                        elif item['is_profitable'] and not item['is_popular']:
-                            matrix_data['Puzzles'].append(item)
-                        elif not item['is_profitable'] and item['is_popular']:
-                            matrix_data['Workhorses'].append(item)
-                        else:
-                            matrix_data['Dogs'].append(item)
-                    
+                if not menu_df.empty:
                     # Create visualization
                     import plotly.express as px
                     import plotly.graph_objects as go
                     
                     # Create matrix data for scatter plot
-                    scatter_data = pd.DataFrame([{
-                        'Item': item['name'],
-                        'Profit Margin': item['profit_margin'],
-                        'Quantity Sold': item['quantity'],
-                        'Revenue': item['revenue'],
-                        'Category': 'Stars' if item['is_profitable'] and item['is_popular'] else
-                                  'Puzzles' if item['is_profitable'] and not item['is_popular'] else
-                                  'Workhorses' if not item['is_profitable'] and item['is_popular'] else 'Dogs'
-                    } for item in menu_items])
+                    scatter_data = pd.DataFrame({
+                        'Item': menu_df['name'],
+                        'Profit Margin': menu_df['profit_margin'],
+                        'Quantity Sold': menu_df['quantity'],
+                        'Revenue': menu_df['revenue'],
+                        'Category': menu_df['category']
+                    })
                     
                     # Create scatter plot
                     fig = px.scatter(
@@ -482,67 +531,24 @@ with tab3:
                     # Display matrix data
                     st.write("### Menu Categories")
                     
-                    matrix_tab1, matrix_tab2, matrix_tab3, matrix_tab4 = st.tabs(["Stars", "Puzzles", "Workhorses", "Dogs"])
+                    matrix_tabs = st.tabs([category for category, _, _ in MENU_CATEGORIES])
                     
-                    with matrix_tab1:
-                        st.write("#### Stars (High Profit, High Popularity)")
-                        st.write("These items are your best performers. Promote them prominently.")
-                        
-                        if matrix_data['Stars']:
-                            stars_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Quantity': item['quantity'],
-                                'Profit Margin': f"{item['profit_margin']:.1f}%"
-                            } for item in matrix_data['Stars']])
-                            
-                            st.dataframe(stars_df, hide_index=True)
-                        else:
-                            st.info("No items in this category.")
-                    
-                    with matrix_tab2:
-                        st.write("#### Puzzles (High Profit, Low Popularity)")
-                        st.write("These items are profitable but need promotion to increase sales.")
-                        
-                        if matrix_data['Puzzles']:
-                            puzzles_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Quantity': item['quantity'],
-                                'Profit Margin': f"{item['profit_margin']:.1f}%"
-                            } for item in matrix_data['Puzzles']])
-                            
-                            st.dataframe(puzzles_df, hide_index=True)
-                        else:
-                            st.info("No items in this category.")
-                    
-                    with matrix_tab3:
-                        st.write("#### Workhorses (Low Profit, High Popularity)")
-                        st.write("These items are popular but not very profitable. Look for ways to increase margins.")
-                        
-                        if matrix_data['Workhorses']:
-                            workhorses_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Quantity': item['quantity'],
-                                'Profit Margin': f"{item['profit_margin']:.1f}%"
-                            } for item in matrix_data['Workhorses']])
+                    for matrix_tab, (category, heading, description) in zip(matrix_tabs, MENU_CATEGORIES):
+                        with matrix_tab:
+                            st.write(f"#### {category} ({heading})")
+                            st.write(description)
                             
-                            st.dataframe(workhorses_df, hide_index=True)
-                        else:
-                            st.info("No items in this category.")
-                    
-                    with matrix_tab4:
-                        st.write("#### Dogs (Low Profit, Low Popularity)")
-                        st.write("Consider removing these items from your menu or revamping them.")
-                        
-                        if matrix_data['Dogs']:
-                            dogs_df = pd.DataFrame([{
-                                'Item': item['name'],
-                                'Quantity': item['quantity'],
-                                'Profit Margin': f"{item['profit_margin']:.1f}%"
-                            } for item in matrix_data['Dogs']])
-                            
-                            st.dataframe(dogs_df, hide_index=True)
-                        else:
-                            st.info("No items in this category.")
+                            category_items = menu_df[menu_df['category'] == category]
+                            if not category_items.empty:
+                                category_df = pd.DataFrame({
+                                    'Item': category_items['name'],
+                                    'Quantity': category_items['quantity'],
+                                    'Profit Margin': category_items['profit_margin'].map('{:.1f}%'.format)
+                                })
+                                
+                                st.dataframe(category_df, hide_index=True)
+                            else:
+                                st.info("No items in this category.")
                 else:
                     st.info("Could not find matching recipes for your sales data. Make sure recipe names match sales items.")
             else:
@@ -557,11 +563,7 @@ with tab3:
             if generate_button:
                 with st.spinner("Analyzing menu data and generating recommendations..."):
                     # Prepare data for AI
-                    context = {
-                        "recipes": st.session_state.recipes,
-                        "sales": st.session_state.sales,
-                        "inventory": st.session_state.inventory
-                    }
+                    context = report_cached('llm_summary', build_llm_summary)
                     
                     # Query AI for recommendations
                     prompt = """
@@ -582,27 +584,20 @@ with tab3:
         st.write("### Seasonal Analysis")
         
         # Check if we have enough data with dates
-        sales_df = pd.DataFrame(st.session_state.sales)
+        sales_df = get_sales_df()
         
         if not sales_df.empty and 'date' in sales_df.columns:
-            # Convert date to datetime
-            sales_df['date'] = pd.to_datetime(sales_df['date'])
-            
-            # Add month and season columns
-            sales_df['month'] = sales_df['date'].dt.month
+            # Add month and season columns for sales with a valid date
+            sales_df = sales_df[sales_df['date'].notna()]
+            sales_df = sales_df.assign(month=sales_df['date'].dt.month)
             
             # Define seasons
-            def get_season(month):
-                if month in [12, 1, 2]:
-                    return 'Winter'
-                elif month in [3, 4, 5]:
-                    return 'Spring'
-                elif month in [6, 7, 8]:
-                    return 'Summer'
-                else:
-                    return 'Fall'
-            
-            sales_df['season'] = sales_df['month'].apply(get_season)
+            month = sales_df['month'].to_numpy()
+            sales_df['season'] = np.select(
+                [np.isin(month, [12, 1, 2]), np.isin(month, [3, 4, 5]), np.isin(month, [6, 7, 8])],
+                ['Winter', 'Spring', 'Summer'],
+                default='Fall'
+            )
             
             # Check if we have data spanning multiple seasons
             seasons_present = sales_df['season'].nunique()
@@ -647,8 +642,7 @@ with tab3:
                                         for item in items]
                                 for season, items in top_seasonal_items.items()
                             },
-                            "recipes": st.session_state.recipes,
-                            "inventory": st.session_state.inventory
+                            "data_summary": report_cached('llm_summary', build_llm_summary)
                         }
                         
                         seasonal_prompt = """
@@ -736,9 +730,8 @@ with tab4:
             
             elif report_type == "Sales Performance":
                 # Filter sales by date range
-                sales_df = pd.DataFrame(st.session_state.sales)
+                sales_df = get_sales_df()
                 if not sales_df.empty and 'date' in sales_df.columns:
-                    sales_df['date'] = pd.to_datetime(sales_df['date'])
                     filtered_sales = sales_df[
                         (sales_df['date'].dt.date >= start_date) & 
                         (sales_df['date'].dt.date <= end_date)
@@ -766,9 +759,8 @@ with tab4:
             
             elif report_type == "Menu Profitability":
                 # Filter sales by date range
-                sales_df = pd.DataFrame(st.session_state.sales)
+                sales_df = get_sales_df()
                 if not sales_df.empty and 'date' in sales_df.columns:
-                    sales_df['date'] = pd.to_datetime(sales_df['date'])
                     filtered_sales = sales_df[
                         (sales_df['date'].dt.date >= start_date) & 
                         (sales_df['date'].dt.date <= end_date)
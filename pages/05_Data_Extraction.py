@@ -7,7 +7,7 @@ import io
 import tempfile
 import shutil
 from datetime import datetime
-from utils.data_processing import load_data, save_data
+from utils.data_processing import load_data, save_data, save_inventory_data, save_recipes_data
 from utils.excel_extraction import safe_read_excel, detect_file_type, extract_recipes_from_excel, extract_inventory_from_excel, extract_sales_from_excel
 from utils.abgn_extractor import extract_recipe_costing, extract_inventory, extract_sales
 from improved_recipe_extractor import extract_all_recipes
@@ -48,10 +48,10 @@ os.makedirs('data/uploaded', exist_ok=True)
 
 # Helper functions to save data
 def save_recipes():
-    save_data(st.session_state.recipes, 'data/recipes.json')
+    save_recipes_data(st.session_state.recipes)
 
 def save_inventory():
-    save_data(st.session_state.inventory, 'data/inventory.json')
+    save_inventory_data(st.session_state.inventory)
 
 def save_sales():
     save_data(st.session_state.sales, 'data/sales.json')
@@ -8,7 +8,7 @@ from datetime import datetime
 # Add the root directory to sys.path to import modules from other directories
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.data_processing import load_data, save_data
+from utils.data_processing import load_data, save_recipes_data
 from models.recipe import Recipe
 
 # Constants
@@ -430,7 +430,7 @@ with col2:
                         recipes_data.append(recipe)
                         
                     # Save back to file
-                    if save_data(recipes_data, RECIPES_FILE):
+                    if save_recipes_data(recipes_data, RECIPES_FILE):
                         st.success("All changes saved successfully!")
                     else:
                         st.error("Failed to save changes. Please try again.")
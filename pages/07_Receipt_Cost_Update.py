@@ -7,7 +7,7 @@ import io
 import tempfile
 import time
 from datetime import datetime
-from utils.data_processing import load_data, save_data
+from utils.data_processing import load_data, save_inventory_data, save_recipes_data
 from utils.price_updater import process_receipt_data, update_recipe_costs, display_price_update_summary
 from utils.receipt_processor import process_abgn_receipt, process_generic_receipt, preview_receipt_columns
 
@@ -72,10 +72,10 @@ if 'update_results' not in st.session_state:
 
 # Function to save recipes to file
 def save_recipes():
-    save_data(st.session_state.recipes, 'data/recipes.json')
+    save_recipes_data(st.session_state.recipes)
 
 def save_inventory():
-    save_data(st.session_state.inventory, 'data/inventory.json')
+    save_inventory_data(st.session_state.inventory)
 
 # Main page header
 st.title("💰 Recipe Cost Updater")
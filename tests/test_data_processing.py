@@ -0,0 +1,52 @@
+from utils.data_processing import calculate_recipe_costs, load_parquet_data, save_parquet_data
+
+
+def test_parquet_round_trip_keeps_records_unchanged(tmp_path):
+    records = [
+        {
+            "id": "a1",
+            "name": "Flour",
+            "unit": "kg",
+            "price": 1.25,
+            "stock": 40,
+            "supplier": None,
+            "price_history": [{"date": "2024-01-01", "price": 1.2}],
+        },
+        {
+            "id": "a2",
+            "name": "Butter",
+            "unit": None,
+            "price": None,
+            "stock": None,
+            "supplier": "Dairy Co",
+        },
+        {
+            "id": "a3",
+            "name": "Sugar",
+            "price": 0.9,
+            "stock": 12,
+            "price_history": None,
+        },
+    ]
+    file_path = tmp_path / "inventory.parquet"
+
+    assert save_parquet_data(records, str(file_path))
+    loaded = load_parquet_data(str(file_path))
+
+    assert loaded == records
+    assert [type(record.get("stock")) for record in loaded] == [int, type(None), int]
+    assert "unit" not in loaded[2] and "supplier" not in loaded[2]
+    assert loaded[1]["unit"] is None and loaded[1]["stock"] is None
+
+
+def test_recipe_costs_coerce_imported_values():
+    recipes = [
+        {"ingredients": [{"cost": None}, {"cost": "2.5"}, {"cost": 3}], "yield_amount": 0},
+        {"ingredients": [{"cost": 4}], "yield_amount": "2"},
+        {"ingredients": [{"cost": 1}], "yield_amount": None},
+    ]
+
+    total_costs, cost_per_unit = calculate_recipe_costs(recipes)
+
+    assert total_costs.tolist() == [5.5, 4.0, 1.0]
+    assert cost_per_unit.tolist() == [5.5, 2.0, 1.0]
@@ -1,9 +1,31 @@
+import io
 import json
 import os
+import re
+import numpy as np
+import orjson
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 
+def _read_json(file_path):
+    """
+    Parse a JSON file with orjson
+    
+    Args:
+        file_path (str): Path to the JSON file
+    
+    Returns:
+        list or dict: The parsed data
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # Files written by json.dump may contain NaN/Infinity, which orjson rejects
+        return json.loads(raw)
+
 def load_data(file_path):
     """
     Load data from a JSON file
@@ -16,8 +38,39 @@ def load_data(file_path):
     """
     try:
         if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            return _read_json(file_path)
+        return []
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        return []
+
+@st.cache_data(show_spinner=False)
+def _load_json(file_path, mtime):
+    """
+    Parse a JSON file, cached on its path and modification time
+    
+    Args:
+        file_path (str): Path to the JSON file
+        mtime (float): Modification time of the file, used as part of the cache key
+    
+    Returns:
+        list or dict: The loaded data
+    """
+    return _read_json(file_path)
+
+def load_data_cached(file_path):
+    """
+    Load data from a JSON file, re-reading it only when the file changes
+    
+    Args:
+        file_path (str): Path to the JSON file
+    
+    Returns:
+        list or dict: The loaded data
+    """
+    try:
+        if os.path.exists(file_path):
+            return _load_json(file_path, os.path.getmtime(file_path))
         return []
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
@@ -54,8 +107,12 @@ def save_data(data, file_path):
                 'data': data
             }
         
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # orjson encodes in C and writes bytes directly
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+        
+        # Drop cached parses so the next load sees the new file
+        _load_json.clear()
         
         st.success(f"Successfully saved data to {file_path}")
         return True
@@ -63,7 +120,206 @@ def save_data(data, file_path):
         st.error(f"Error saving data: {str(e)}")
         return False
 
-def process_excel_upload(uploaded_file, data_type, column_mapping=None):
+def save_parquet_data(records, file_path):
+    """
+    Save a list of records to a Parquet file alongside its JSON copy
+    
+    Args:
+        records (list): The records to save
+        file_path (str): Path to the Parquet file
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        df = pd.DataFrame(records)
+        
+        # Nested values (e.g. price_history) are stored as JSON text so mixed entry shapes round-trip unchanged
+        json_columns = [
+            col for col in df.columns
+            if df[col].dtype == object and df[col].map(lambda v: isinstance(v, (list, dict))).any()
+        ]
+        for col in json_columns:
+            df[col] = df[col].map(lambda v: orjson.dumps(v).decode() if isinstance(v, (list, dict)) else v)
+        df.attrs['json_columns'] = json_columns
+        
+        # Integer columns with gaps would otherwise be widened to float, so keep them as nullable Int64
+        for col in df.columns:
+            values = [record[col] for record in records if record.get(col) is not None]
+            if values and len(values) < len(records) and all(
+                isinstance(v, int) and not isinstance(v, bool) for v in values
+            ):
+                df[col] = pd.array([record.get(col) for record in records], dtype='Int64')
+        
+        # Row positions of the records that lack each key, so absent keys and explicit None stay distinct
+        df.attrs['absent_keys'] = {
+            col: [i for i, record in enumerate(records) if col not in record]
+            for col in df.columns
+            if any(col not in record for record in records)
+        }
+        
+        df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+        return True
+    except Exception:
+        # The JSON file stays the source of truth, so a failed Parquet write is not fatal
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return False
+
+def load_parquet_data(file_path):
+    """
+    Load a list of records saved by save_parquet_data
+    
+    Args:
+        file_path (str): Path to the Parquet file
+    
+    Returns:
+        list: The loaded records
+    """
+    df = pd.read_parquet(file_path, engine='pyarrow')
+    json_columns = df.attrs.get('json_columns', [])
+    absent_keys = {col: set(rows) for col, rows in df.attrs.get('absent_keys', {}).items()}
+    
+    records = []
+    for i, row in enumerate(df.to_dict('records')):
+        record = {}
+        for key, value in row.items():
+            if i in absent_keys.get(key, ()):
+                continue
+            if not isinstance(value, str) and pd.isna(value):
+                # The columnar layout stores an explicit None as a missing value
+                value = None
+            elif key in json_columns:
+                value = orjson.loads(value)
+            record[key] = value
+        records.append(record)
+    return records
+
+def load_records(json_path, parquet_path):
+    """
+    Load records from the Parquet copy when it is current, otherwise from JSON
+    
+    Args:
+        json_path (str): Path to the JSON file
+        parquet_path (str): Path to the Parquet file
+    
+    Returns:
+        list: The loaded records
+    """
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(json_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(json_path)
+    ):
+        try:
+            return load_parquet_data(parquet_path)
+        except Exception:
+            pass
+    
+    data = load_data_cached(json_path)
+    # Saved files wrap the list in a dict with a 'data' field
+    if isinstance(data, dict) and 'data' in data:
+        data = data['data']
+    return data
+
+def save_inventory_data(inventory):
+    """
+    Save the inventory to JSON with its Parquet copy and mark inventory-derived caches stale
+    
+    Args:
+        inventory (list): The inventory items to save
+    
+    Returns:
+        bool: True if the JSON file was saved, False otherwise
+    """
+    saved = save_data(inventory, 'data/inventory.json')
+    save_parquet_data(inventory, 'data/inventory.parquet')
+    # Pages key their inventory caches on this counter, since in-place edits keep the list's id and length
+    st.session_state.inventory_version = st.session_state.get('inventory_version', 0) + 1
+    return saved
+
+def save_recipes_data(recipes, file_path='data/recipes.json'):
+    """
+    Save the recipes to JSON and mark recipe-derived caches stale
+    
+    Args:
+        recipes (list): The recipes to save
+        file_path (str): Path to the JSON file
+    
+    Returns:
+        bool: True if the JSON file was saved, False otherwise
+    """
+    saved = save_data(recipes, file_path)
+    # Pages key their recipe caches on this counter, since in-place edits keep the list's id and length
+    st.session_state.recipes_version = st.session_state.get('recipes_version', 0) + 1
+    return saved
+
+def session_data_key(*names):
+    """
+    Build a cache key for session state lists from their version counters and identities
+    
+    Args:
+        *names (str): Session state keys such as 'sales', 'recipes' or 'inventory'
+    
+    Returns:
+        tuple: One (version, id, length) entry per list
+    """
+    # Saves bump the '<name>_version' counter, covering in-place edits that keep the list's id and length
+    return tuple(
+        (st.session_state.get(f'{name}_version', 0), id(st.session_state[name]), len(st.session_state[name]))
+        for name in names
+    )
+
+def session_cached(name, build, key_parts):
+    """
+    Memoize a derived value in session state until its key parts change
+    
+    Args:
+        name (str): Cache entry name, unique across pages
+        build (callable): Builds the value when the entry is missing or stale
+        key_parts (tuple): Values identifying the inputs, e.g. from session_data_key
+    
+    Returns:
+        The cached or newly built value
+    """
+    cache = st.session_state.setdefault('session_cache', {})
+    entry = cache.get(name)
+    if entry is None or entry[0] != key_parts:
+        entry = (key_parts, build())
+        cache[name] = entry
+    return entry[1]
+
+def build_sales_df(sales):
+    """
+    Build the sales records as a DataFrame with parsed dates
+    
+    Args:
+        sales (list): Sales records
+    
+    Returns:
+        DataFrame: The sales with a datetime 'date' column, unparseable dates as NaT
+    """
+    sales_df = pd.DataFrame(sales)
+    if 'date' not in sales_df.columns:
+        sales_df['date'] = pd.NaT
+    sales_df['date'] = pd.to_datetime(sales_df['date'], format='ISO8601', errors='coerce', cache=True)
+    return sales_df
+
+@st.cache_data(show_spinner=False)
+def read_excel_cached(file_bytes, **kwargs):
+    """
+    Parse an Excel file from its raw bytes, cached on the file contents
+    
+    Args:
+        file_bytes (bytes): Contents of the Excel file
+        **kwargs: Extra arguments passed to pd.read_excel
+    
+    Returns:
+        DataFrame: The parsed sheet
+    """
+    return pd.read_excel(io.BytesIO(file_bytes), **kwargs)
+
+def process_excel_upload(uploaded_file, data_type, column_mapping=None, df=None):
     """
     Process an uploaded Excel file
     
@@ -71,6 +327,7 @@ def process_excel_upload(uploaded_file, data_type, column_mapping=None):
         uploaded_file (UploadedFile): The uploaded Excel file
         data_type (str): Type of data ('recipe', 'inventory', 'sales')
         column_mapping (dict, optional): Mapping of columns from file to system
+        df (DataFrame, optional): Already-parsed file contents, read from disk if omitted
     
     Returns:
         dict: Processed data and status information
@@ -82,7 +339,8 @@ def process_excel_upload(uploaded_file, data_type, column_mapping=None):
             f.write(uploaded_file.getbuffer())
         
         # Read the file
-        df = pd.read_excel(file_path)
+        if df is None:
+            df = pd.read_excel(file_path)
         
         # Process the data based on type
         if data_type == 'recipe':
@@ -128,8 +386,11 @@ def process_recipe_data(df, column_mapping):
     
     recipes = []
     
-    # Process each recipe
-    for _, row in df.iterrows():
+    # One timestamp for the whole batch
+    timestamp = datetime.now().isoformat()
+    
+    # Process each recipe, reading rows as plain dicts rather than Series
+    for row in df.to_dict('records'):
         try:
             recipe = {
                 "name": str(row.get(name_col, "")),
@@ -137,8 +398,8 @@ def process_recipe_data(df, column_mapping):
                 "yield_unit": str(row.get(yield_unit_col, "serving")),
                 "ingredients": [],
                 "preparation_steps": [],
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "created_at": timestamp,
+                "updated_at": timestamp
             }
             
             # Process ingredients if available
@@ -153,7 +414,6 @@ def process_recipe_data(df, column_mapping):
                         continue
                     
                     # Try to parse amount and unit
-                    import re
                     match = re.search(r'(\d+\.?\d*)\s*([a-zA-Z]+)', ing_str)
                     
                     if match:
@@ -334,19 +594,34 @@ def process_sales_data(df, column_mapping):
     
     return sales_records
 
-def calculate_recipe_cost(recipe, inventory):
+def build_inventory_dict(inventory):
+    """
+    Build a lookup of inventory items by lowercased name
+    
+    Args:
+        inventory (list): Inventory data
+    
+    Returns:
+        dict: Inventory items keyed by lowercased name
+    """
+    return {item["name"].lower(): item for item in inventory}
+
+def calculate_recipe_cost(recipe, inventory, inventory_dict=None):
     """
     Calculate the cost of a recipe based on inventory prices
     
     Args:
         recipe (dict): Recipe data
         inventory (list): Inventory data
+        inventory_dict (dict, optional): Prebuilt lookup from build_inventory_dict,
+            so costing many recipes doesn't rebuild it per call
     
     Returns:
         float: Total cost of the recipe
     """
     # Create a dictionary of inventory items for quick lookup
-    inventory_dict = {item["name"].lower(): item for item in inventory}
+    if inventory_dict is None:
+        inventory_dict = build_inventory_dict(inventory)
     
     total_cost = 0
     
@@ -387,6 +662,43 @@ def calculate_recipe_cost(recipe, inventory):
     
     return total_cost
 
+def calculate_recipe_costs(recipes):
+    """
+    Calculate total and per-unit costs for many recipes at once
+    
+    Ingredient costs are flattened into a single array with one recipe index per
+    ingredient, so the per-recipe sums run as one numpy reduction. Missing or
+    non-numeric costs count as 0 and a missing, zero or negative yield counts as 1.
+    
+    Args:
+        recipes (list): Recipe data
+    
+    Returns:
+        tuple: Arrays of total costs and costs per yield unit, aligned with recipes
+    """
+    counts = np.fromiter(
+        (len(recipe.get("ingredients", [])) for recipe in recipes),
+        dtype=np.int64,
+        count=len(recipes)
+    )
+    # Imported values may be None or text, so coerce them and treat anything unparseable as 0
+    ingredient_costs = pd.to_numeric(
+        pd.Series([ingredient.get("cost", 0) for recipe in recipes for ingredient in recipe.get("ingredients", [])], dtype=object),
+        errors="coerce"
+    ).fillna(0).to_numpy(dtype=np.float64)
+    yields = pd.to_numeric(
+        pd.Series([recipe.get("yield_amount", 1) for recipe in recipes], dtype=object),
+        errors="coerce"
+    ).fillna(0).to_numpy(dtype=np.float64)
+    # A missing, zero or negative yield counts as a single unit
+    yields = np.where(yields > 0, yields, 1.0)
+    
+    recipe_index = np.repeat(np.arange(len(recipes)), counts)
+    total_costs = np.bincount(recipe_index, weights=ingredient_costs, minlength=len(recipes)).astype(np.float64)
+    cost_per_unit = total_costs / yields
+    
+    return total_costs, cost_per_unit
+
 def generate_column_mapping_ui(df, data_type):
     """
     Generate a UI for mapping columns from an uploaded file to system fields
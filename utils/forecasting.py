@@ -21,8 +21,9 @@ def prepare_time_series_data(sales_data, recipe_data, inventory_data):
     # Convert sales data to DataFrame
     sales_df = pd.DataFrame(sales_data)
     
-    # Ensure date is in datetime format
-    sales_df['date'] = pd.to_datetime(sales_df['date'])
+    # Ensure date is in datetime format, dropping sales whose date can't be parsed
+    sales_df['date'] = pd.to_datetime(sales_df['date'], format='ISO8601', errors='coerce')
+    sales_df = sales_df.dropna(subset=['date'])
     
     # Create a mapping of recipe items to ingredients
     recipe_ingredients = {}
@@ -171,6 +172,9 @@ def forecast_ingredient_demand(usage_data, forecast_days=30):
     # Convert forecasts to DataFrame
     forecast_df = pd.DataFrame(forecasts)
     
+    # Categorical ingredient names let per-ingredient groupbys work on integer codes
+    forecast_df['ingredient'] = forecast_df['ingredient'].astype('category')
+    
     return forecast_df
 
 def identify_sales_trends(sales_data, recipe_data):
@@ -182,29 +186,35 @@ def identify_sales_trends(sales_data, recipe_data):
         recipe_data (list): Recipe data
     
     Returns:
-        dict: Identified trends
+        dict: Identified trends, with every item's growth in the "growth_trends" DataFrame
     """
     # Convert to DataFrame
     sales_df = pd.DataFrame(sales_data)
     
-    # Skip if empty
+    # Ensure date is in datetime format, dropping sales whose date can't be parsed
+    if not sales_df.empty:
+        sales_df['date'] = pd.to_datetime(sales_df['date'], format='ISO8601', errors='coerce')
+        sales_df = sales_df.dropna(subset=['date'])
+    
+    # Skip if no sales have a valid date
     if sales_df.empty:
         return {
             "top_sellers": [],
             "growing_items": [],
             "declining_items": [],
+            "growth_trends": pd.DataFrame({'name': pd.Series(dtype=object), 'growth': pd.Series(dtype=np.float64)}),
             "weekly_patterns": {}
         }
     
-    # Ensure date is in datetime format
-    sales_df['date'] = pd.to_datetime(sales_df['date'])
-    
     # Add week and day columns
     sales_df['week'] = sales_df['date'].dt.isocalendar().week
     sales_df['day_of_week'] = sales_df['date'].dt.dayofweek
     
+    # Group on integer codes rather than hashing item name strings
+    sales_df['item_name'] = sales_df['item_name'].astype('category')
+    
     # 1. Top selling items
-    top_sellers = sales_df.groupby('item_name')['quantity'].sum().sort_values(ascending=False).head(5)
+    top_sellers = sales_df.groupby('item_name', observed=True, sort=False)['quantity'].sum().sort_values(ascending=False).head(5)
     
     # 2. Growing and declining items (compare recent to earlier period)
     # Split data into recent and earlier periods
@@ -215,20 +225,24 @@ def identify_sales_trends(sales_data, recipe_data):
     
     # Calculate sales volumes for both periods
     if not recent_sales.empty and not earlier_sales.empty:
-        recent_vol = recent_sales.groupby('item_name')['quantity'].sum()
-        earlier_vol = earlier_sales.groupby('item_name')['quantity'].sum()
+        recent_vol = recent_sales.groupby('item_name', observed=True, sort=False)['quantity'].sum()
+        earlier_vol = earlier_sales.groupby('item_name', observed=True, sort=False)['quantity'].sum()
         
         # Combine and calculate growth
         combined = pd.DataFrame({'recent': recent_vol, 'earlier': earlier_vol}).fillna(0)
         combined['growth'] = (combined['recent'] - combined['earlier']) / combined['earlier'].replace(0, 1) * 100
         
-        # Get top growing and declining items
-        growing = combined.sort_values('growth', ascending=False).head(3)
-        declining = combined.sort_values('growth', ascending=True).head(3)
+        # Every item's growth, highest first
+        growth_trends = pd.DataFrame({
+            'name': combined.index.to_numpy(dtype=object),
+            'growth': combined['growth'].to_numpy(dtype=np.float64)
+        }).sort_values('growth', ascending=False, kind='stable', ignore_index=True)
         
-        growing_items = [{"name": k, "growth": v} for k, v in growing['growth'].items()]
-        declining_items = [{"name": k, "growth": v} for k, v in declining['growth'].items()]
+        # Get top growing and declining items
+        growing_items = growth_trends.head(3).to_dict('records')
+        declining_items = growth_trends.iloc[::-1].head(3).to_dict('records')
     else:
+        growth_trends = pd.DataFrame({'name': pd.Series(dtype=object), 'growth': pd.Series(dtype=np.float64)})
         growing_items = []
         declining_items = []
     
@@ -253,6 +267,7 @@ def identify_sales_trends(sales_data, recipe_data):
         "top_sellers": [{"name": k, "quantity": float(v)} for k, v in top_sellers.items()],
         "growing_items": growing_items,
         "declining_items": declining_items,
+        "growth_trends": growth_trends,
         "weekly_patterns": weekly_patterns
     }
 
@@ -277,7 +292,7 @@ def recommend_inventory_levels(inventory_data, forecast_data, lead_time_days=2,
     inventory_dict = {item['name']: item for item in inventory_data}
     
     # Calculate total demand during lead time + buffer period
-    lead_time_demand = forecast_data.groupby('ingredient')['forecasted_quantity'].sum() / len(forecast_data['date'].unique()) * lead_time_days
+    lead_time_demand = forecast_data.groupby('ingredient', observed=True, sort=False)['forecasted_quantity'].sum() / len(forecast_data['date'].unique()) * lead_time_days
     
     # Apply buffer
     safety_stock = lead_time_demand * (buffer_percentage / 100)
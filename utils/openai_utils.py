@@ -31,22 +31,108 @@ def query_ai_assistant(query, context=None):
         else:
             user_message = query
         
-        # Call the OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.3,  # Lower temperature for more factual responses
-            max_tokens=1000   # Limit response length
-        )
-        
-        # Return the AI's response
-        return response.choices[0].message.content
+        # Call the OpenAI API, reusing the answer for an identical prompt
+        return _complete_assistant_query(system_message, user_message)
     except Exception as e:
         return f"Error querying AI assistant: {str(e)}"
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _complete_assistant_query(system_message, user_message):
+    """
+    Get the assistant's answer to a prompt, cached on the full prompt text
+    
+    Failed calls raise, so errors are never cached.
+    
+    Args:
+        system_message (str): The system prompt
+        user_message (str): The user prompt, including any context data
+    
+    Returns:
+        str: The AI's response
+    """
+    response = client.chat.completions.create(
+        model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        temperature=0.3,  # Lower temperature for more factual responses
+        max_tokens=1000   # Limit response length
+    )
+    
+    # Return the AI's response
+    return response.choices[0].message.content
+
+def query_ai_assistant_batch(questions, context=None):
+    """
+    Answers several questions about the same context data with a single API call
+    
+    Args:
+        questions (dict): Question text keyed by question id
+        context (dict, optional): Data context to help the AI answer the questions
+    
+    Returns:
+        dict: The AI's answer keyed by question id
+    """
+    try:
+        # Format the prompt
+        system_message = "You are an AI assistant for a hotel cost control system."
+        
+        question_lines = "\n".join(f"{question_id}: {question}" for question_id, question in questions.items())
+        user_message = f"""
+        Answer each of the following questions.
+        Return a JSON object whose keys are the question ids and whose values are the answers formatted as Markdown.
+        
+        {question_lines}
+        """
+        
+        if context:
+            # Convert context data to a readable format
+            context_str = json.dumps(context, indent=2)
+            user_message = f"Context data:\n{context_str}\n\n{user_message}"
+        
+        # Call the OpenAI API, reusing the answers for an identical prompt
+        response = _complete_assistant_batch(system_message, user_message)
+    except Exception as e:
+        # A failed request would fail again per question, so report it instead of retrying
+        return {question_id: f"Error querying AI assistant: {str(e)}" for question_id in questions}
+    
+    try:
+        answers = json.loads(response)
+    except (TypeError, ValueError):
+        answers = {}
+    
+    if isinstance(answers, dict) and all(isinstance(answers.get(question_id), str) for question_id in questions):
+        return {question_id: answers[question_id] for question_id in questions}
+    
+    # Fall back to asking each question on its own when the response is unparseable or missing answers
+    return {question_id: query_ai_assistant(question, context) for question_id, question in questions.items()}
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _complete_assistant_batch(system_message, user_message):
+    """
+    Get the assistant's JSON answers to a batched prompt, cached on the full prompt text
+    
+    Args:
+        system_message (str): The system prompt
+        user_message (str): The user prompt, including the questions and any context data
+    
+    Returns:
+        str: The AI's response as a JSON string
+    """
+    response = client.chat.completions.create(
+        model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.3,  # Lower temperature for more factual responses
+        max_tokens=3000   # Room for every answer in the batch
+    )
+    
+    return response.choices[0].message.content
+
 def extract_recipe_from_document(file_data, file_type):
     """
     Extract recipe information from uploaded documents using OpenAI